@@ -3,9 +3,35 @@
 Demo script for Training Assistant - shows core functionality without UI
 """
 
+import argparse
+import importlib.util
 import sys
 import os
 import time
+
+
+def check_dependencies(names=('numpy',)) -> bool:
+    """Check that required packages are installed without importing them.
+
+    find_spec only reads package metadata, so the probe costs milliseconds
+    where an actual import of a heavy library can take seconds.
+
+    Args:
+        names: Importable package names to probe
+
+    Returns:
+        True if every package is available
+    """
+    missing = [name for name in names if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"Missing dependencies: {', '.join(missing)}")
+        print("Install them with: pip install -r requirements.txt")
+    return not missing
+
+
+if not check_dependencies():
+    sys.exit(1)
+
 import numpy as np
 
 # Add src to path
@@ -32,8 +58,13 @@ def demo_exercise_library():
         print()
 
 
-def demo_repetition_counter():
-    """Demonstrate the repetition counting functionality."""
+def demo_repetition_counter(realtime: bool = False):
+    """Demonstrate the repetition counting functionality.
+
+    Args:
+        realtime: Pace the simulation at 0.5s per step instead of running
+                  as fast as possible
+    """
     print("🔄 Repetition Counter Demo:")
     print("-" * 30)
     
@@ -58,11 +89,20 @@ def demo_repetition_counter():
         (170, "Complete rep 2!"),
     ]
     
-    for angle, description in angle_sequence:
+    # Precompute the whole noise sequence in one vectorized draw; the seeded
+    # generator also makes demo runs reproducible
+    rng = np.random.default_rng(0)
+    noise = rng.uniform(-5, 5, size=(len(angle_sequence), 2))
+
+    # Monotonic deadlines avoid drift when pacing in real time
+    step_interval = 0.5
+    next_deadline = time.monotonic()
+
+    for i, (angle, description) in enumerate(angle_sequence):
         # Simulate both arms having similar angles
         angles = {
-            'left_arm': angle + np.random.uniform(-5, 5),
-            'right_arm': angle + np.random.uniform(-5, 5),
+            'left_arm': angle + noise[i, 0],
+            'right_arm': angle + noise[i, 1],
         }
         
         result = counter.update(angles)
@@ -74,8 +114,10 @@ def demo_repetition_counter():
         
         if result.get('rep_detected'):
             print("    🎉 REP COMPLETED!")
-        
-        time.sleep(0.5)  # Simulate real-time
+
+        if realtime:
+            next_deadline += step_interval
+            time.sleep(max(0.0, next_deadline - time.monotonic()))
     
     print(f"\n✅ Final count: {counter.rep_count} repetitions")
 
@@ -138,9 +180,17 @@ def demo_exercise_configurations():
 
 def main():
     """Run the complete demo."""
+    parser = argparse.ArgumentParser(description="Training Assistant demo")
+    parser.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Pace the repetition counter demo at real-time speed"
+    )
+    args = parser.parse_args()
+
     try:
         demo_exercise_library()
-        demo_repetition_counter()
+        demo_repetition_counter(realtime=args.realtime)
         demo_workout_session()
         demo_exercise_configurations()
         
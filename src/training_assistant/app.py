@@ -4,24 +4,76 @@ Main Streamlit application for the Training Assistant.
 
 import streamlit as st
 import cv2
-import numpy as np
 from datetime import datetime, timedelta
 import time
+import io
 import os
-import sys
-
-# Add the src directory to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from training_assistant.core.pose_estimation import PoseEstimator
-from training_assistant.core.exercise_detector import RepetitionCounter
-from training_assistant.core.video_processor import VideoProcessor, FrameProcessor, create_temp_video_file
+from training_assistant.core.exercise_detector import RepetitionCounter, feedback_level
+from training_assistant.core.video_processor import (
+    VideoProcessor, FrameProcessor, ThreadedFrameReader, create_temp_video_file
+)
 from training_assistant.exercises.exercise_library import ExerciseLibrary
 from training_assistant.data.models import WorkoutDatabase, WorkoutSession
-from training_assistant.ui.dashboard import create_dashboard
+from training_assistant.ui.dashboard import create_dashboard, _load_dashboard_data
 from training_assistant.ui.analytics import create_analytics_view
 
 
+@st.cache_resource
+def _get_pose_estimator(min_detection_confidence: float = 0.5,
+                        min_tracking_confidence: float = 0.5,
+                        frame_skip: int = 1) -> PoseEstimator:
+    """Build the pose estimator once per server process.
+
+    Loading the MediaPipe model takes hundreds of milliseconds and
+    allocates significant memory; cache_resource keeps it alive across
+    Streamlit reruns instead of rebuilding it on every widget interaction.
+    The cache is keyed on the settings, and since cache_resource never
+    evicts on its own, the settings page clears it before fetching with
+    new values so stale estimators do not pile up for the process
+    lifetime.
+    """
+    return PoseEstimator(
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence,
+        frame_skip=frame_skip
+    )
+
+
+@st.cache_resource
+def _get_exercise_library() -> ExerciseLibrary:
+    """Build the static exercise library once per server process."""
+    return ExerciseLibrary()
+
+
+@st.cache_resource
+def _get_database() -> WorkoutDatabase:
+    """Open the workout database once per server process.
+
+    WorkoutDatabase holds a persistent SQLite connection; sharing one
+    instance across reruns avoids reopening the file per interaction.
+    """
+    return WorkoutDatabase()
+
+
+def _display_frame(video_placeholder, frame_bgr):
+    """Push a processed BGR frame to the video placeholder.
+
+    The frame is JPEG-encoded before the push: ~30-80 KB of compressed
+    bytes over the websocket instead of ~1 MB of raw pixels, which keeps
+    remote deployments smooth. cv2.imencode consumes BGR directly, so no
+    separate color conversion pass is needed; the raw-array path remains
+    as a fallback should encoding ever fail.
+    """
+    ok, buf = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if ok:
+        # Fixed display width skips Streamlit's per-frame auto-fit
+        video_placeholder.image(buf.tobytes(), width=640)
+    else:
+        video_placeholder.image(frame_bgr[..., ::-1], channels="RGB", width=640)
+
+
 def init_session_state():
     """Initialize Streamlit session state variables."""
     if 'workout_active' not in st.session_state:
@@ -29,13 +81,19 @@ def init_session_state():
     if 'current_session' not in st.session_state:
         st.session_state.current_session = None
     if 'pose_estimator' not in st.session_state:
-        st.session_state.pose_estimator = PoseEstimator()
+        st.session_state.pose_estimator = _get_pose_estimator()
+    # Kept alongside the estimator so the upload-analysis cache can key
+    # on the active confidence settings
+    if 'min_detection_confidence' not in st.session_state:
+        st.session_state.min_detection_confidence = 0.5
+    if 'min_tracking_confidence' not in st.session_state:
+        st.session_state.min_tracking_confidence = 0.5
     if 'video_processor' not in st.session_state:
         st.session_state.video_processor = VideoProcessor()
     if 'exercise_library' not in st.session_state:
-        st.session_state.exercise_library = ExerciseLibrary()
+        st.session_state.exercise_library = _get_exercise_library()
     if 'database' not in st.session_state:
-        st.session_state.database = WorkoutDatabase()
+        st.session_state.database = _get_database()
     if 'rep_counter' not in st.session_state:
         st.session_state.rep_counter = None
 
@@ -81,12 +139,12 @@ def create_sidebar():
         # Show current workout info
         if st.session_state.current_session:
             session = st.session_state.current_session
-            st.sidebar.markdown(f"**Exercise:** {session.exercise_type.title()}")
+            st.sidebar.markdown(f"**Exercise:** {session.display_name}")
             st.sidebar.markdown(f"**Reps:** {session.total_reps}")
-            if session.start_time:
-                duration = datetime.now() - session.start_time
-                minutes = int(duration.total_seconds() // 60)
-                seconds = int(duration.total_seconds() % 60)
+            start_mono = st.session_state.get('workout_start_monotonic')
+            if start_mono is not None:
+                elapsed = time.monotonic() - start_mono
+                minutes, seconds = divmod(int(elapsed), 60)
                 st.sidebar.markdown(f"**Duration:** {minutes:02d}:{seconds:02d}")
     
     return page, selected_exercise, input_source
@@ -117,6 +175,9 @@ def start_workout(exercise_type: str, input_source: str):
         st.session_state.current_session = session
         st.session_state.rep_counter = rep_counter
         st.session_state.workout_active = True
+        # Monotonic anchor for the live duration display; the datetime
+        # fields stay on the session for persistence only
+        st.session_state.workout_start_monotonic = time.monotonic()
         
         st.success(f"Started {exercise_type.title()} workout!")
         return True
@@ -138,9 +199,11 @@ def stop_workout():
             if session.start_time and session.end_time:
                 session.duration_seconds = (session.end_time - session.start_time).total_seconds()
             
-            # Save session to database
+            # Save session to database; the dashboard's cached fetch is
+            # cleared so the new session shows up on the next render
             database = st.session_state.database
             session_id = database.save_session(session)
+            _load_dashboard_data.clear()
             
             # Cleanup
             st.session_state.video_processor.close()
@@ -201,10 +264,19 @@ def workout_interface():
             )
             
             if uploaded_file is not None:
-                # Create temporary file and process
-                temp_file_path = create_temp_video_file(uploaded_file)
-                if st.session_state.video_processor.open_video_file(temp_file_path):
-                    process_video_file(video_placeholder, temp_file_path)
+                # Analysis is cached on the upload bytes: a widget
+                # interaction mid-playback reruns this function, but the
+                # decode + inference pass is only ever paid once per file
+                analysis = _analyze_uploaded_video(
+                    uploaded_file.getvalue(),
+                    st.session_state.current_session.exercise_type,
+                    st.session_state.min_detection_confidence,
+                    st.session_state.min_tracking_confidence
+                )
+                if analysis['frames']:
+                    _replay_analysis(video_placeholder, analysis)
+                    st.session_state.rep_counter.rep_count = analysis['total_reps']
+                    st.session_state.current_session.total_reps = analysis['total_reps']
                 else:
                     st.error("Failed to process uploaded video file.")
         else:
@@ -216,6 +288,14 @@ def workout_interface():
         display_workout_stats()
 
 
+# Partial reruns (Streamlit >= 1.33): frame updates re-execute only the
+# workout interface instead of the whole script, so the sidebar and page
+# routing stay out of the per-frame cost; older versions fall back to
+# whole-script reruns unchanged
+if hasattr(st, "fragment"):
+    workout_interface = st.fragment(workout_interface)
+
+
 def process_camera_feed(video_placeholder):
     """Process live camera feed."""
     pose_estimator = st.session_state.pose_estimator
@@ -229,19 +309,18 @@ def process_camera_feed(video_placeholder):
         # Resize frame for processing
         processed_frame = FrameProcessor.resize_frame(frame, target_width=640)
         
-        # Enhance frame quality
-        enhanced_frame = FrameProcessor.enhance_frame(processed_frame)
-        
-        # Detect pose
-        pose_data = pose_estimator.detect_pose(enhanced_frame)
+        # Enhance frame quality only when the lighting probe flags it
+        enhanced_frame = FrameProcessor.maybe_enhance_frame(processed_frame)
         
+        # Detect pose and compute key angles in one fused call
+        pose_data, angles = pose_estimator.analyze_frame(enhanced_frame)
+
         if pose_data:
             # Draw pose landmarks
             enhanced_frame = pose_estimator.draw_landmarks(enhanced_frame, pose_data)
-            
-            # Calculate angles and update rep counter
-            angles = pose_estimator.get_key_angles(pose_data)
-            rep_update = rep_counter.update(angles)
+
+            # Update rep counter
+            rep_update = rep_counter.update_array(angles)
             
             # Update session stats
             if rep_update['rep_detected']:
@@ -257,64 +336,116 @@ def process_camera_feed(video_placeholder):
                 rep_update.get('angle')
             )
         
-        # Convert BGR to RGB for display
-        display_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_BGR2RGB)
-        video_placeholder.image(display_frame, channels="RGB", use_column_width=True)
+        _display_frame(video_placeholder, enhanced_frame)
 
 
-def process_video_file(video_placeholder, file_path):
-    """Process uploaded video file."""
-    pose_estimator = st.session_state.pose_estimator
-    rep_counter = st.session_state.rep_counter
-    video_processor = st.session_state.video_processor
-    
-    # Progress bar for video processing
+@st.cache_data(persist="disk", show_spinner="Analyzing video...")
+def _analyze_uploaded_video(video_bytes: bytes, exercise_type: str,
+                            min_detection_confidence: float = 0.5,
+                            min_tracking_confidence: float = 0.5) -> dict:
+    """Run the full pose and rep analysis for an uploaded video once.
+
+    Cached on the raw upload bytes, the exercise and the confidence
+    settings: any Streamlit rerun (every widget interaction re-executes
+    the script) replays the stored per-frame results instead of
+    re-decoding and re-running inference, the disk-persisted cache
+    survives server restarts, and changing the detection settings
+    invalidates the entry so they apply to uploads too.
+
+    Returns:
+        Dictionary with 'fps', 'total_reps' and 'frames', the latter a
+        list of per-frame records carrying the JPEG-encoded overlaid
+        frame and the rep count at that point
+    """
+    temp_file_path = create_temp_video_file(io.BytesIO(video_bytes))
+
+    video_processor = VideoProcessor()
+    if not video_processor.open_video_file(temp_file_path):
+        os.unlink(temp_file_path)
+        return {'fps': 30, 'total_reps': 0, 'frames': []}
+
+    pose_estimator = _get_pose_estimator(
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence
+    )
+    rep_counter = RepetitionCounter(exercise_type)
+
+    # Decode frames on a background thread so the MediaPipe stage does
+    # not stall on video I/O
+    frame_reader = ThreadedFrameReader(video_processor).start()
+
+    frames = []
+    try:
+        for frame in frame_reader.frames():
+            processed_frame = FrameProcessor.resize_frame(frame, target_width=640)
+            enhanced_frame = FrameProcessor.maybe_enhance_frame(processed_frame)
+
+            pose_data, angles = pose_estimator.analyze_frame(enhanced_frame)
+
+            if pose_data:
+                enhanced_frame = pose_estimator.draw_landmarks(enhanced_frame, pose_data)
+                rep_update = rep_counter.update_array(angles)
+
+                enhanced_frame = FrameProcessor.add_info_overlay(
+                    enhanced_frame,
+                    rep_counter.rep_count,
+                    exercise_type,
+                    rep_update['current_phase'],
+                    rep_update['form_feedback'],
+                    rep_update.get('angle')
+                )
+
+            ok, buf = cv2.imencode('.jpg', enhanced_frame,
+                                   [cv2.IMWRITE_JPEG_QUALITY, 80])
+            if ok:
+                frames.append({
+                    'jpeg': buf.tobytes(),
+                    'rep_count': rep_counter.rep_count
+                })
+    finally:
+        frame_reader.stop()
+        video_processor.close()
+        if os.path.exists(temp_file_path):
+            os.unlink(temp_file_path)
+
+    return {
+        'fps': video_processor.fps or 30,
+        'total_reps': rep_counter.rep_count,
+        'frames': frames
+    }
+
+
+def _replay_analysis(video_placeholder, analysis: dict):
+    """Play back cached analysis frames at the source frame rate."""
     progress_bar = st.progress(0)
-    
-    while True:
-        frame = video_processor.get_frame()
-        
-        if frame is None:
-            break
-        
-        # Update progress
-        video_info = video_processor.get_frame_info()
-        if 'progress' in video_info:
-            progress_bar.progress(video_info['progress'])
-        
-        # Process frame (similar to camera feed)
-        processed_frame = FrameProcessor.resize_frame(frame, target_width=640)
-        enhanced_frame = FrameProcessor.enhance_frame(processed_frame)
-        
-        pose_data = pose_estimator.detect_pose(enhanced_frame)
-        
-        if pose_data:
-            enhanced_frame = pose_estimator.draw_landmarks(enhanced_frame, pose_data)
-            angles = pose_estimator.get_key_angles(pose_data)
-            rep_update = rep_counter.update(angles)
-            
-            if rep_update['rep_detected']:
-                st.session_state.current_session.total_reps = rep_counter.rep_count
-            
-            enhanced_frame = FrameProcessor.add_info_overlay(
-                enhanced_frame,
-                rep_counter.rep_count,
-                st.session_state.current_session.exercise_type,
-                rep_update['current_phase'],
-                rep_update['form_feedback'],
-                rep_update.get('angle')
-            )
-        
-        # Display frame
-        display_frame = cv2.cvtColor(enhanced_frame, cv2.COLOR_BGR2RGB)
-        video_placeholder.image(display_frame, channels="RGB", use_column_width=True)
-        
-        # Small delay for video playback
-        time.sleep(0.033)  # ~30 FPS
-    
-    # Clean up temporary file
-    if os.path.exists(file_path):
-        os.unlink(file_path)
+
+    # Pace playback against monotonic deadlines at the source frame rate;
+    # a fixed per-frame sleep would add the push time on top and silently
+    # drift slower than the video
+    frame_interval = 1.0 / (analysis['fps'] or 30)
+    next_deadline = time.monotonic()
+
+    # Throttle progress-bar updates to ~5 Hz; every update is a rerender
+    # message to the browser and would otherwise run once per frame
+    update_every = max(1, int(analysis['fps'] or 30) // 5)
+    total = len(analysis['frames'])
+
+    for i, record in enumerate(analysis['frames']):
+        video_placeholder.image(record['jpeg'], width=640)
+
+        if (i + 1) % update_every == 0:
+            progress_bar.progress((i + 1) / total)
+
+        next_deadline += frame_interval
+        delay = next_deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Pushing fell behind; reset the deadline instead of
+            # accumulating debt
+            next_deadline = time.monotonic()
+
+    progress_bar.progress(1.0)
 
 
 def display_workout_stats():
@@ -331,10 +462,10 @@ def display_workout_stats():
             st.metric("Reps", rep_counter.rep_count)
         
         with col2:
-            if session.start_time:
-                duration = datetime.now() - session.start_time
-                minutes = int(duration.total_seconds() // 60)
-                seconds = int(duration.total_seconds() % 60)
+            start_mono = st.session_state.get('workout_start_monotonic')
+            if start_mono is not None:
+                elapsed = time.monotonic() - start_mono
+                minutes, seconds = divmod(int(elapsed), 60)
                 st.metric("Duration", f"{minutes:02d}:{seconds:02d}")
         
         # Current phase
@@ -344,7 +475,7 @@ def display_workout_stats():
         st.subheader("Form Feedback")
         if hasattr(rep_counter, 'form_feedback') and rep_counter.form_feedback:
             for feedback in rep_counter.form_feedback:
-                if any(word in feedback.lower() for word in ['good', 'ready', 'keep']):
+                if feedback_level(feedback) == "ok":
                     st.success(feedback)
                 else:
                     st.warning(feedback)
@@ -378,13 +509,37 @@ def main():
         display_settings()
 
 
+@st.cache_data
+def _muscle_group_options() -> list:
+    """Collect the sorted muscle-group filter options.
+
+    The library is static data, so the set union only ever needs to run
+    once instead of on every rerun of the library page.
+    """
+    exercises = _get_exercise_library().get_all_exercises()
+    muscle_groups = set()
+    for config in exercises.values():
+        muscle_groups.update(config.primary_muscle_groups)
+    return sorted(muscle_groups)
+
+
+@st.cache_data
+def _filtered_exercises(difficulty_filter: str, muscle_filter: str) -> dict:
+    """Resolve the library filters, cached per filter combination."""
+    exercise_library = _get_exercise_library()
+    # Muscle group takes precedence over difficulty, matching the
+    # original sequential-overwrite behavior
+    if muscle_filter != "All":
+        return exercise_library.get_exercises_by_muscle_group(muscle_filter.lower())
+    if difficulty_filter != "All":
+        return exercise_library.get_exercises_by_difficulty(difficulty_filter.lower())
+    return exercise_library.get_all_exercises()
+
+
 def display_exercise_library():
     """Display the exercise library page."""
     st.title("📚 Exercise Library")
-    
-    exercise_library = st.session_state.exercise_library
-    exercises = exercise_library.get_all_exercises()
-    
+
     # Filter options
     col1, col2 = st.columns(2)
     with col1:
@@ -392,23 +547,15 @@ def display_exercise_library():
             "Filter by Difficulty",
             ["All", "Beginner", "Intermediate", "Advanced"]
         )
-    
+
     with col2:
-        muscle_groups = set()
-        for config in exercises.values():
-            muscle_groups.update(config.primary_muscle_groups)
-        
         muscle_filter = st.selectbox(
             "Filter by Muscle Group",
-            ["All"] + sorted(list(muscle_groups))
+            ["All"] + _muscle_group_options()
         )
-    
+
     # Apply filters
-    filtered_exercises = exercises
-    if difficulty_filter != "All":
-        filtered_exercises = exercise_library.get_exercises_by_difficulty(difficulty_filter.lower())
-    if muscle_filter != "All":
-        filtered_exercises = exercise_library.get_exercises_by_muscle_group(muscle_filter.lower())
+    filtered_exercises = _filtered_exercises(difficulty_filter, muscle_filter)
     
     # Display exercises
     for name, config in filtered_exercises.items():
@@ -453,13 +600,31 @@ def display_settings():
             value=0.5,
             step=0.1
         )
-    
+
+    # Angles change slowly relative to the frame rate, so running the
+    # pose model on every 2nd or 3rd frame and reusing the last
+    # landmarks in between roughly halves or thirds inference cost
+    frame_skip = st.slider(
+        "Run Pose Detection Every Nth Frame",
+        min_value=1,
+        max_value=4,
+        value=1,
+        step=1
+    )
+
     if st.button("Update Settings"):
-        # Reinitialize pose estimator with new settings
-        st.session_state.pose_estimator = PoseEstimator(
+        # Drop the previously cached estimators before fetching with the
+        # new settings: cache_resource never evicts by itself, so every
+        # settings combination tried would otherwise keep its MediaPipe
+        # graph alive for the rest of the process
+        _get_pose_estimator.clear()
+        st.session_state.pose_estimator = _get_pose_estimator(
             min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
+            min_tracking_confidence=min_tracking_confidence,
+            frame_skip=frame_skip
         )
+        st.session_state.min_detection_confidence = min_detection_confidence
+        st.session_state.min_tracking_confidence = min_tracking_confidence
         st.success("Settings updated successfully!")
     
     st.subheader("Data Management")
@@ -3,70 +3,184 @@ Exercise detection and repetition counting module.
 Handles the logic for detecting different exercises and counting repetitions.
 """
 
+import math
+
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
-from collections import deque
+from enum import IntEnum
 import time
 
+try:
+    from numba import njit as _njit
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    _njit = None
+
+
+class Phase(IntEnum):
+    """Movement phase of the repetition state machine."""
+    READY = 0
+    DOWN = 1
+    UP = 2
+
+
+# Lowercase names for the string-facing current_phase API
+_PHASE_NAMES = ("ready", "down", "up")
+
+# Fixed key-angle order shared with PoseEstimator.get_key_angles_array;
+# indexing a small array avoids per-frame dictionary hashing
+_ANGLE_NAMES = ('left_arm', 'right_arm', 'left_leg', 'right_leg')
+L_ARM, R_ARM, L_LEG, R_LEG = range(4)
+
+# Severity of each feedback message the counter can emit, classified
+# where the strings are defined so the UI can dispatch on a dict lookup
+# instead of scanning every string for keywords per rerun
+_POSITIVE_FEEDBACK = frozenset({
+    "Good form! Ready for next rep",
+    "Keep going!",
+})
+
+
+# Shared constant for the no-detection case; avoids allocating the same
+# single-element list every frame the pose is lost
+_NO_POSE_FEEDBACK = ("Unable to detect pose",)
+
+
+def feedback_level(message: str) -> str:
+    """
+    Classify a form-feedback message for display purposes.
+
+    Args:
+        message: Feedback string produced by RepetitionCounter
+
+    Returns:
+        "ok" for encouraging messages, "warn" for corrections
+    """
+    return "ok" if message in _POSITIVE_FEEDBACK else "warn"
+
+
+def _rep_step(angle, buf, head, count, angle_sum, below_mask, above_mask,
+              req, phase, flexed_phase, min_th, max_th):
+    """Fused per-frame step: smoothing, debounce and phase transition.
+
+    Pure scalar/array-slot arithmetic so Numba can compile it when
+    available; the interpreted version is used otherwise. Returns the
+    updated state as a flat tuple the caller writes back.
+    """
+    evicted = buf[head]
+    buf[head] = angle
+    angle_sum += buf[head] - evicted
+    head = (head + 1) % buf.shape[0]
+    if count < buf.shape[0]:
+        count += 1
+    smoothed = angle_sum / count
+
+    below_mask = ((below_mask << 1) | (1 if smoothed < min_th else 0)) & 0xFF
+    above_mask = ((above_mask << 1) | (1 if smoothed > max_th else 0)) & 0xFF
+
+    rep_detected = False
+    if phase == 0:
+        if (below_mask & req) == req:
+            phase = flexed_phase
+    elif phase == flexed_phase:
+        if (above_mask & req) == req:
+            rep_detected = True
+            phase = 0
+
+    return smoothed, head, count, angle_sum, below_mask, above_mask, phase, rep_detected
+
+
+if _njit is not None:
+    _rep_step_jit = _njit(cache=True)(_rep_step)
+    # Warm the JIT at import so the first workout frame is not the one
+    # paying the compile cost
+    _rep_step_jit(90.0, np.zeros(5, dtype=np.float32), 0, 0, 0.0, 0, 0, 1, 0, 1, 70.0, 160.0)
+else:
+    _rep_step_jit = None
+
 
 class RepetitionCounter:
     """Handles repetition counting for various exercises."""
-    
-    def __init__(self, exercise_type: str, smoothing_window: int = 5):
+
+    # Tolerances for left/right symmetry checks (degrees)
+    ARM_SYMMETRY_TOLERANCE = 15
+    LEG_SYMMETRY_TOLERANCE = 20
+
+    # Per-exercise parameters: (min threshold, max threshold, primary
+    # angle, movement pattern). Looked up once in __init__ instead of
+    # walking an if/elif ladder
+    EXERCISE_PARAMS = {
+        "pushups": (70, 160, "arm", "down_up"),
+        "squats": (70, 160, "leg", "down_up"),
+        "pullups": (40, 160, "arm", "up_down"),
+        "lunges": (80, 160, "leg", "down_up"),
+        "bicep_curls": (30, 160, "arm", "up_down"),
+    }
+    _DEFAULT_PARAMS = (70, 160, "arm", "down_up")
+
+    def __init__(self, exercise_type: str, smoothing_window: int = 5,
+                 debounce_frames: int = 1):
         """
         Initialize the repetition counter.
-        
+
         Args:
             exercise_type: Type of exercise to count
             smoothing_window: Number of frames for smoothing calculations
+            debounce_frames: Number of consecutive frames a threshold must
+                             hold before a phase transition fires (1 keeps
+                             the original first-crossing behavior)
         """
         self.exercise_type = exercise_type.lower()
         self.smoothing_window = smoothing_window
-        self.angle_history = deque(maxlen=smoothing_window)
+        # Fixed-size ring buffer for the smoothing window: bounded memory,
+        # no per-frame container churn
+        self._angle_buf = np.zeros(smoothing_window, dtype=np.float32)
+        self._angle_head = 0
+        self._angle_count = 0
+        self._angle_sum = 0.0
         self.rep_count = 0
         self.in_rep = False
         self.last_direction = None
         self.min_angle_threshold = None
         self.max_angle_threshold = None
-        self.current_phase = "ready"  # ready, down, up
-        self.form_feedback = []
+        self._phase = Phase.READY
+        self.form_feedback = ()
+        # Debounce state: packed bit history of threshold comparisons, so a
+        # single noisy frame cannot trigger a phase transition
+        self.debounce_frames = max(1, min(8, debounce_frames))
+        self._debounce_req = (1 << self.debounce_frames) - 1
+        self._below_mask = 0
+        self._above_mask = 0
+        # Memoized feedback keyed on quantized angles: consecutive frames of
+        # a held pose produce identical keys, so the evaluators are skipped
+        self._form_cache = {}
+        # Scratch array for the dict-based update() adapter
+        self._angles_arr = np.full(len(_ANGLE_NAMES), np.nan, dtype=np.float32)
         
         # Set exercise-specific parameters
         self._setup_exercise_parameters()
-    
+
+    @property
+    def current_phase(self) -> str:
+        """Current phase name ("ready", "down" or "up")."""
+        return _PHASE_NAMES[self._phase]
+
     def _setup_exercise_parameters(self):
         """Setup exercise-specific parameters for counting and form evaluation."""
-        
-        if self.exercise_type == "pushups":
-            self.min_angle_threshold = 70  # Arms bent (down position)
-            self.max_angle_threshold = 160  # Arms extended (up position)
-            self.primary_angle = "arm"
-            
-        elif self.exercise_type == "squats":
-            self.min_angle_threshold = 70  # Legs bent (down position)
-            self.max_angle_threshold = 160  # Legs extended (up position)
-            self.primary_angle = "leg"
-            
-        elif self.exercise_type == "pullups":
-            self.min_angle_threshold = 40  # Arms bent (up position)
-            self.max_angle_threshold = 160  # Arms extended (down position)
-            self.primary_angle = "arm"
-            
-        elif self.exercise_type == "lunges":
-            self.min_angle_threshold = 80  # Front leg bent
-            self.max_angle_threshold = 160  # Front leg extended
-            self.primary_angle = "leg"
-            
-        elif self.exercise_type == "bicep_curls":
-            self.min_angle_threshold = 30  # Arms bent (up position)
-            self.max_angle_threshold = 160  # Arms extended (down position)
-            self.primary_angle = "arm"
-            
-        else:
-            # Default parameters
-            self.min_angle_threshold = 70
-            self.max_angle_threshold = 160
-            self.primary_angle = "arm"
+        (self.min_angle_threshold,
+         self.max_angle_threshold,
+         self.primary_angle,
+         self.movement_pattern) = self.EXERCISE_PARAMS.get(
+            self.exercise_type, self._DEFAULT_PARAMS
+        )
+
+        # Phase for the flexed half of the movement: a "down_up" exercise
+        # bottoms out in DOWN, an "up_down" one peaks in UP
+        self._flexed_phase = Phase.DOWN if self.movement_pattern == "down_up" else Phase.UP
+
+        # Which pair of key-angle array slots feeds the primary angle
+        self._primary_pair = (
+            (L_ARM, R_ARM) if self.primary_angle == "arm" else (L_LEG, R_LEG)
+        )
     
     def get_primary_angle(self, angles: Dict[str, float]) -> Optional[float]:
         """
@@ -114,44 +228,102 @@ class RepetitionCounter:
         Returns:
             Smoothed angle value
         """
-        self.angle_history.append(angle)
-        return np.mean(list(self.angle_history))
+        # O(1) moving average: the running sum replaces a mean over the
+        # window, so cost no longer scales with the window size
+        evicted = float(self._angle_buf[self._angle_head])
+        self._angle_buf[self._angle_head] = angle
+        # Read back the stored (float32-rounded) value so the running sum
+        # stays consistent with what will be evicted later
+        self._angle_sum += float(self._angle_buf[self._angle_head]) - evicted
+        self._angle_head = (self._angle_head + 1) % self.smoothing_window
+        if self._angle_count < self.smoothing_window:
+            self._angle_count += 1
+        return self._angle_sum / self._angle_count
     
     def update(self, angles: Dict[str, float]) -> Dict[str, Any]:
         """
         Update the repetition counter with new angle measurements.
-        
+
+        Adapter for dictionary input; the hot path is update_array,
+        which skips the key hashing entirely.
+
         Args:
             angles: Dictionary of current angle measurements
-            
+
         Returns:
             Dictionary containing count updates and feedback
         """
-        primary_angle = self.get_primary_angle(angles)
-        
+        arr = self._angles_arr
+        for i, name in enumerate(_ANGLE_NAMES):
+            value = angles.get(name)
+            arr[i] = np.nan if value is None else value
+        return self.update_array(arr)
+
+    def update_array(self, angles: Optional[np.ndarray]) -> Dict[str, Any]:
+        """
+        Update the repetition counter from a fixed-order angle array.
+
+        Args:
+            angles: Array of shape (4,) in _ANGLE_NAMES order with NaN
+                    for unavailable angles, or None when no pose was
+                    detected
+
+        Returns:
+            Dictionary containing count updates and feedback
+        """
+        primary_angle = None
+        if angles is not None:
+            left = float(angles[self._primary_pair[0]])
+            right = float(angles[self._primary_pair[1]])
+            if not math.isnan(left) and not math.isnan(right):
+                primary_angle = (left + right) / 2
+            elif not math.isnan(left):
+                primary_angle = left
+            elif not math.isnan(right):
+                primary_angle = right
+
         if primary_angle is None:
             return {
                 'rep_count': self.rep_count,
                 'current_phase': self.current_phase,
-                'form_feedback': ["Unable to detect pose"],
-                'angle': None
+                'form_feedback': _NO_POSE_FEEDBACK,
+                'angle': None,
+                'rep_detected': False,
+                'feedback_changed': False
             }
-        
-        # Smooth the angle
-        smoothed_angle = self.smooth_angle(primary_angle)
-        
-        # Update repetition count based on exercise type
-        rep_detected = self._detect_repetition(smoothed_angle)
-        
-        # Generate form feedback
+
+        # Run the fused smoothing + state-machine step; the compiled
+        # kernel replaces two interpreted passes when numba is installed
+        if _rep_step_jit is not None:
+            (smoothed_angle, self._angle_head, self._angle_count,
+             self._angle_sum, self._below_mask, self._above_mask,
+             phase, rep_detected) = _rep_step_jit(
+                primary_angle, self._angle_buf, self._angle_head,
+                self._angle_count, self._angle_sum, self._below_mask,
+                self._above_mask, self._debounce_req, int(self._phase),
+                int(self._flexed_phase), float(self.min_angle_threshold),
+                float(self.max_angle_threshold)
+            )
+            if rep_detected:
+                self.rep_count += 1
+            self._phase = Phase(phase)
+        else:
+            smoothed_angle = self.smooth_angle(primary_angle)
+            rep_detected = self._detect_repetition(smoothed_angle)
+
+        # Generate form feedback; cache hits return the identical tuple,
+        # so an identity check is enough to tell the UI nothing changed
         form_feedback = self._evaluate_form(angles, smoothed_angle)
-        
+        feedback_changed = form_feedback is not self.form_feedback
+        self.form_feedback = form_feedback
+
         return {
             'rep_count': self.rep_count,
             'current_phase': self.current_phase,
             'form_feedback': form_feedback,
             'angle': smoothed_angle,
-            'rep_detected': rep_detected
+            'rep_detected': rep_detected,
+            'feedback_changed': feedback_changed
         }
     
     def _detect_repetition(self, angle: float) -> bool:
@@ -165,119 +337,165 @@ class RepetitionCounter:
             True if a repetition was detected
         """
         rep_detected = False
-        
-        # State machine for repetition counting
-        if self.exercise_type in ["pushups", "squats", "lunges"]:
-            # Down-up movement pattern
-            if self.current_phase == "ready":
-                if angle < self.min_angle_threshold:
-                    self.current_phase = "down"
-            elif self.current_phase == "down":
-                if angle > self.max_angle_threshold:
-                    self.current_phase = "up"
-                    self.rep_count += 1
-                    rep_detected = True
-                    self.current_phase = "ready"
-                    
-        elif self.exercise_type in ["pullups", "bicep_curls"]:
-            # Up-down movement pattern
-            if self.current_phase == "ready":
-                if angle < self.min_angle_threshold:
-                    self.current_phase = "up"
-            elif self.current_phase == "up":
-                if angle > self.max_angle_threshold:
-                    self.current_phase = "down"
-                    self.rep_count += 1
-                    rep_detected = True
-                    self.current_phase = "ready"
-        
+
+        # Shift this frame's threshold comparisons into the packed history
+        # masks; a transition requires the last debounce_frames bits set
+        self._below_mask = ((self._below_mask << 1) |
+                            (angle < self.min_angle_threshold)) & 0xFF
+        self._above_mask = ((self._above_mask << 1) |
+                            (angle > self.max_angle_threshold)) & 0xFF
+        req = self._debounce_req
+        at_bottom = (self._below_mask & req) == req
+        at_top = (self._above_mask & req) == req
+
+        # Single data-driven state machine: cross below the minimum
+        # threshold into the flexed phase, then back above the maximum to
+        # complete the rep — only the phase label differs per movement
+        # pattern
+        if self._phase == Phase.READY:
+            if at_bottom:
+                self._phase = self._flexed_phase
+        elif self._phase == self._flexed_phase:
+            if at_top:
+                self.rep_count += 1
+                rep_detected = True
+                self._phase = Phase.READY
+
         return rep_detected
     
-    def _evaluate_form(self, angles: Dict[str, float], primary_angle: float) -> List[str]:
+    # Angle quantization step for the feedback cache, in half-degrees;
+    # feedback thresholds are all whole degrees, so this loses nothing
+    _FORM_CACHE_QUANT = 2
+    _FORM_CACHE_MAX = 256
+
+    def _evaluate_form(self, angles: np.ndarray, primary_angle: float) -> Tuple[str, ...]:
         """
         Evaluate exercise form and provide feedback.
-        
+
+        Results are cached on (phase, quantized angles): during the steady
+        parts of a rep the inputs barely move, so most frames hit the cache
+        and the exact same tuple object is handed back — no per-frame
+        allocation while the pose holds steady.
+
         Args:
-            angles: All calculated angles
-            primary_angle: Primary angle for the exercise
-            
+            angles: Key angles in _ANGLE_NAMES order (NaN when missing)
+            primary_angle: Smoothed primary angle for the exercise
+
         Returns:
-            List of form feedback messages
+            Tuple of form feedback messages
         """
+        quant = self._FORM_CACHE_QUANT
+        key = (
+            int(self._phase),
+            int(primary_angle * quant),
+            tuple(
+                -1 if math.isnan(value) else int(value * quant)
+                for value in angles.tolist()
+            )
+        )
+
+        cached = self._form_cache.get(key)
+        if cached is not None:
+            return cached
+
+        feedback = tuple(self._compute_form_feedback(angles, primary_angle))
+
+        if len(self._form_cache) >= self._FORM_CACHE_MAX:
+            self._form_cache.clear()
+        self._form_cache[key] = feedback
+
+        return feedback
+
+    def _compute_form_feedback(self, angles: np.ndarray, primary_angle: float) -> List[str]:
+        """Compute form feedback for the current frame (uncached path)."""
         feedback = []
-        
-        if self.exercise_type == "pushups":
-            feedback.extend(self._evaluate_pushup_form(angles, primary_angle))
-        elif self.exercise_type == "squats":
-            feedback.extend(self._evaluate_squat_form(angles, primary_angle))
-        elif self.exercise_type == "pullups":
-            feedback.extend(self._evaluate_pullup_form(angles, primary_angle))
+
+        evaluator = self._FORM_EVALUATORS.get(self.exercise_type)
+        if evaluator is not None:
+            feedback.extend(evaluator(self, angles, primary_angle))
         else:
             # Generic feedback
-            if self.current_phase == "down" and primary_angle > self.min_angle_threshold + 20:
+            if self._phase == Phase.DOWN and primary_angle > self.min_angle_threshold + 20:
                 feedback.append("Go deeper")
-            elif self.current_phase == "up" and primary_angle < self.max_angle_threshold - 20:
+            elif self._phase == Phase.UP and primary_angle < self.max_angle_threshold - 20:
                 feedback.append("Full extension")
-        
+
         if not feedback:
-            if self.current_phase == "ready":
+            if self._phase == Phase.READY:
                 feedback.append("Good form! Ready for next rep")
             else:
                 feedback.append("Keep going!")
         
         return feedback
     
-    def _evaluate_pushup_form(self, angles: Dict[str, float], primary_angle: float) -> List[str]:
+    def _evaluate_pushup_form(self, angles: np.ndarray, primary_angle: float) -> List[str]:
         """Evaluate pushup-specific form."""
         feedback = []
-        
+
         # Check arm symmetry
-        left_arm = angles.get('left_arm')
-        right_arm = angles.get('right_arm')
-        
-        if left_arm and right_arm and abs(left_arm - right_arm) > 15:
+        left_arm = float(angles[L_ARM])
+        right_arm = float(angles[R_ARM])
+
+        if (not math.isnan(left_arm) and not math.isnan(right_arm)
+                and abs(left_arm - right_arm) > self.ARM_SYMMETRY_TOLERANCE):
             feedback.append("Keep arms symmetric")
         
         # Check depth
-        if self.current_phase == "down" and primary_angle > 90:
+        if self._phase == Phase.DOWN and primary_angle > 90:
             feedback.append("Go lower - chest to ground")
         
         return feedback
     
-    def _evaluate_squat_form(self, angles: Dict[str, float], primary_angle: float) -> List[str]:
+    def _evaluate_squat_form(self, angles: np.ndarray, primary_angle: float) -> List[str]:
         """Evaluate squat-specific form."""
         feedback = []
-        
+
         # Check depth
-        if self.current_phase == "down" and primary_angle > 90:
+        if self._phase == Phase.DOWN and primary_angle > 90:
             feedback.append("Squat deeper - thighs parallel to ground")
-        
+
         # Check leg symmetry
-        left_leg = angles.get('left_leg')
-        right_leg = angles.get('right_leg')
-        
-        if left_leg and right_leg and abs(left_leg - right_leg) > 20:
+        left_leg = float(angles[L_LEG])
+        right_leg = float(angles[R_LEG])
+
+        if (not math.isnan(left_leg) and not math.isnan(right_leg)
+                and abs(left_leg - right_leg) > self.LEG_SYMMETRY_TOLERANCE):
             feedback.append("Balance both legs evenly")
         
         return feedback
     
-    def _evaluate_pullup_form(self, angles: Dict[str, float], primary_angle: float) -> List[str]:
+    def _evaluate_pullup_form(self, angles: np.ndarray, primary_angle: float) -> List[str]:
         """Evaluate pullup-specific form."""
         feedback = []
         
         # Check if arms are fully extended at bottom
-        if self.current_phase == "ready" and primary_angle < 150:
+        if self._phase == Phase.READY and primary_angle < 150:
             feedback.append("Full arm extension at bottom")
         
         # Check if chin goes over bar (approximated by arm angle)
-        if self.current_phase == "up" and primary_angle > 50:
+        if self._phase == Phase.UP and primary_angle > 50:
             feedback.append("Pull chin over the bar")
         
         return feedback
-    
+
+    # Dispatch table mapping exercise type to its form evaluator; exercises
+    # without a dedicated evaluator fall back to the generic depth/extension
+    # feedback in _evaluate_form
+    _FORM_EVALUATORS = {
+        "pushups": _evaluate_pushup_form,
+        "squats": _evaluate_squat_form,
+        "pullups": _evaluate_pullup_form,
+    }
+
     def reset(self):
         """Reset the repetition counter."""
         self.rep_count = 0
-        self.current_phase = "ready"
-        self.angle_history.clear()
-        self.form_feedback = []
\ No newline at end of file
+        self._phase = Phase.READY
+        self._angle_head = 0
+        self._angle_count = 0
+        self._angle_sum = 0.0
+        self._angle_buf[:] = 0
+        self._below_mask = 0
+        self._above_mask = 0
+        self.form_feedback = ()
+        self._form_cache.clear()
\ No newline at end of file
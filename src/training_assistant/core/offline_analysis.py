@@ -0,0 +1,289 @@
+"""
+Offline (batch) video analysis.
+Collects landmarks for every frame first, then runs angle computation,
+smoothing and repetition counting as vectorized passes over the whole video.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from typing import Dict, Optional, Any
+
+from .pose_estimation import (
+    PoseEstimator, NUM_LANDMARKS, _KEY_ANGLE_NAMES, _KEY_ANGLE_TRIPLET_IDX,
+    calculate_angles_batch
+)
+from .exercise_detector import RepetitionCounter
+from .video_processor import VideoProcessor, ThreadedFrameReader
+
+
+def collect_landmarks(video_path: str,
+                      pose_estimator: Optional[PoseEstimator] = None) -> np.ndarray:
+    """
+    Run pose inference over a whole video and stack the landmarks.
+
+    Args:
+        video_path: Path to the video file
+        pose_estimator: Estimator to reuse, or None to create one
+
+    Returns:
+        Array of shape (F, 33, 2) with per-frame landmark coordinates;
+        frames without a detected pose are filled with NaN. Stored as
+        float16: the coordinates are normalized to [0, 1], well within
+        half precision, and the whole-video stack halves in memory
+    """
+    if pose_estimator is None:
+        pose_estimator = PoseEstimator()
+
+    processor = VideoProcessor()
+    if not processor.open_video_file(video_path):
+        return np.empty((0, NUM_LANDMARKS, 2), dtype=np.float16)
+
+    # Decode on a background thread: OpenCV releases the GIL while
+    # decoding, so the next frame is ready by the time inference finishes
+    reader = ThreadedFrameReader(processor).start()
+
+    frames = []
+    try:
+        for frame in reader.frames():
+            pose_data = pose_estimator.detect_pose(frame)
+            if pose_data is not None:
+                frames.append(pose_data['landmark_array'].astype(np.float16))
+            else:
+                frames.append(np.full((NUM_LANDMARKS, 2), np.nan, dtype=np.float16))
+    finally:
+        reader.stop()
+        processor.close()
+
+    if not frames:
+        return np.empty((0, NUM_LANDMARKS, 2), dtype=np.float16)
+
+    return np.stack(frames)
+
+
+# Per-process pose estimator for the parallel path: MediaPipe graphs are
+# not picklable, so each worker builds its own on first use and keeps it
+# for the life of the process
+_worker_estimator: Optional[PoseEstimator] = None
+
+
+def _init_worker(counter) -> None:
+    """Pin a worker process to its own CPU before it does any work.
+
+    Each worker draws a distinct index from the shared counter — pid
+    modulo the CPU count can hand two workers the same core — and pins
+    itself to that CPU where the platform supports it.
+    """
+    if hasattr(os, 'sched_setaffinity'):
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+
+def _landmarks_for_frame(frame: np.ndarray) -> Optional[np.ndarray]:
+    """Run pose inference on one frame inside a worker process."""
+    global _worker_estimator
+    if _worker_estimator is None:
+        # One single-threaded estimator per worker: the pool already
+        # saturates the cores, so internal OpenCV/OpenMP pools would
+        # only add context-switch and cache thrash
+        _worker_estimator = PoseEstimator(single_thread=True)
+    pose_data = _worker_estimator.detect_pose(frame)
+    if pose_data is None:
+        return None
+    # float16 halves the pickle traffic back to the parent as well as
+    # the stacked history's footprint
+    return pose_data['landmark_array'].astype(np.float16)
+
+
+def collect_landmarks_parallel(video_path: str,
+                               max_workers: Optional[int] = None) -> np.ndarray:
+    """
+    Run pose inference over a whole video across multiple processes.
+
+    MediaPipe Pose has no intra-model batching, but independent graphs
+    scale across cores: frames are fanned out round-robin to worker
+    processes and the results are reassembled in frame order. Intended
+    for offline file analysis only — the extra in-flight frames add
+    latency that camera mode cannot afford.
+
+    Args:
+        video_path: Path to the video file
+        max_workers: Number of worker processes, or None for the CPU count
+
+    Returns:
+        Array of shape (F, 33, 2) with per-frame landmark coordinates;
+        frames without a detected pose are filled with NaN
+    """
+    processor = VideoProcessor()
+    if not processor.open_video_file(video_path):
+        return np.empty((0, NUM_LANDMARKS, 2), dtype=np.float16)
+
+    reader = ThreadedFrameReader(processor).start()
+
+    nan_frame = np.full((NUM_LANDMARKS, 2), np.nan, dtype=np.float16)
+    frames = []
+    # OpenMP sizes its pool when the libraries load, so the cap must be
+    # in the environment before the workers import cv2/mediapipe — i.e.
+    # before the pool spawns them, not inside PoseEstimator.__init__
+    os.environ.setdefault('OMP_NUM_THREADS', '1')
+    worker_counter = multiprocessing.Value('i', 0)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(worker_counter,)) as pool:
+            # Bound the number of in-flight frames so a long video never
+            # sits fully decoded in memory; futures are drained in submit
+            # order, which is frame order
+            window = 2 * (max_workers or os.cpu_count() or 1)
+            pending = deque()
+            for frame in reader.frames():
+                pending.append(pool.submit(_landmarks_for_frame, frame))
+                if len(pending) >= window:
+                    landmarks = pending.popleft().result()
+                    frames.append(landmarks if landmarks is not None else nan_frame)
+            while pending:
+                landmarks = pending.popleft().result()
+                frames.append(landmarks if landmarks is not None else nan_frame)
+    finally:
+        reader.stop()
+        processor.close()
+
+    if not frames:
+        return np.empty((0, NUM_LANDMARKS, 2), dtype=np.float16)
+
+    return np.stack(frames)
+
+
+def key_angles_batch(landmarks_all: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute every key angle for every frame in one vectorized pass.
+
+    Args:
+        landmarks_all: Array of shape (F, 33, 2) from collect_landmarks
+
+    Returns:
+        Dictionary mapping angle name to an array of F angles in degrees
+        (NaN where no pose was detected)
+    """
+    if len(landmarks_all) == 0:
+        return {name: np.empty(0, dtype=np.float32) for name in _KEY_ANGLE_NAMES}
+
+    # (F, 4, 3, 2) -> flatten to one batch for the angle kernel
+    triplets = landmarks_all[:, _KEY_ANGLE_TRIPLET_IDX]
+    angles = calculate_angles_batch(
+        triplets.reshape(-1, 3, 2)
+    ).reshape(len(landmarks_all), len(_KEY_ANGLE_NAMES))
+
+    return {
+        name: angles[:, i] for i, name in enumerate(_KEY_ANGLE_NAMES)
+    }
+
+
+def smooth_angles_batch(angles: np.ndarray, window: int = 5) -> np.ndarray:
+    """
+    Apply the rep counter's moving-average smoothing to a whole series.
+
+    Args:
+        angles: Per-frame angle values
+        window: Smoothing window size
+
+    Returns:
+        Smoothed angle series of the same length
+    """
+    if len(angles) == 0:
+        return angles
+
+    kernel = np.full(window, 1.0 / window, dtype=np.float32)
+    smoothed = np.convolve(angles, kernel, mode='full')[:len(angles)]
+    # Match the warm-up behavior of the online counter: partial windows
+    # average only the samples seen so far
+    counts = np.minimum(np.arange(1, len(angles) + 1), window)
+    smoothed *= window / counts
+    return smoothed
+
+
+def count_reps_batch(angles: np.ndarray,
+                     min_angle_threshold: float,
+                     max_angle_threshold: float) -> int:
+    """
+    Count repetitions over a full angle series without a per-frame loop.
+
+    A rep is a crossing below the minimum threshold followed by a crossing
+    above the maximum threshold, matching RepetitionCounter's state machine.
+
+    Args:
+        angles: Smoothed per-frame primary angles
+        min_angle_threshold: Angle below which the movement bottom is reached
+        max_angle_threshold: Angle above which the movement top is reached
+
+    Returns:
+        Number of completed repetitions
+    """
+    if len(angles) == 0:
+        return 0
+
+    # -1 where below the bottom threshold, +1 where above the top one
+    signal = np.zeros(len(angles), dtype=np.int8)
+    signal[angles < min_angle_threshold] = -1
+    signal[angles > max_angle_threshold] = 1
+
+    transitions = signal[signal != 0]
+    if len(transitions) < 2:
+        return 0
+
+    return int(np.count_nonzero((transitions[:-1] == -1) & (transitions[1:] == 1)))
+
+
+def analyze_video_offline(video_path: str,
+                          exercise_type: str,
+                          pose_estimator: Optional[PoseEstimator] = None,
+                          max_workers: int = 1) -> Dict[str, Any]:
+    """
+    Analyze a whole video in batch mode.
+
+    Args:
+        video_path: Path to the video file
+        exercise_type: Exercise to count repetitions for
+        pose_estimator: Estimator to reuse, or None to create one
+        max_workers: Worker processes for pose inference; values above 1
+                     fan frames out via collect_landmarks_parallel
+
+    Returns:
+        Dictionary with 'rep_count', 'angles' (per-frame key angles) and
+        'frames_analyzed'
+    """
+    counter = RepetitionCounter(exercise_type)
+
+    if max_workers > 1:
+        landmarks_all = collect_landmarks_parallel(video_path, max_workers)
+    else:
+        landmarks_all = collect_landmarks(video_path, pose_estimator)
+    angles = key_angles_batch(landmarks_all)
+
+    # Primary angle series: average of both sides, same as the online counter
+    if counter.primary_angle == "leg":
+        primary = np.nanmean(
+            np.stack([angles['left_leg'], angles['right_leg']]), axis=0
+        )
+    else:
+        primary = np.nanmean(
+            np.stack([angles['left_arm'], angles['right_arm']]), axis=0
+        )
+
+    valid = primary[~np.isnan(primary)]
+    smoothed = smooth_angles_batch(valid, counter.smoothing_window)
+    rep_count = count_reps_batch(
+        smoothed, counter.min_angle_threshold, counter.max_angle_threshold
+    )
+
+    return {
+        'rep_count': rep_count,
+        'angles': angles,
+        'frames_analyzed': len(landmarks_all),
+    }
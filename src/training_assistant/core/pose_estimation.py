@@ -3,32 +3,265 @@ Core pose estimation module using MediaPipe.
 Handles pose detection and landmark extraction from video frames.
 """
 
+import math
+import threading
+
 import cv2
 import mediapipe as mp
 import numpy as np
 from typing import Optional, List, Tuple, Dict, Any
 
 
+# Landmark indices from the MediaPipe pose model
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+RIGHT_ELBOW = 14
+LEFT_WRIST = 15
+RIGHT_WRIST = 16
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+RIGHT_KNEE = 26
+LEFT_ANKLE = 27
+RIGHT_ANKLE = 28
+
+NUM_LANDMARKS = 33
+
+# Landmark index triplets (point1, vertex, point3) for each named key angle
+_KEY_ANGLE_NAMES = ('left_arm', 'right_arm', 'left_leg', 'right_leg')
+
+# Indices into the key-angle array returned by get_key_angles_array,
+# matching the _KEY_ANGLE_NAMES order
+L_ARM, R_ARM, L_LEG, R_LEG = range(4)
+_KEY_ANGLE_TRIPLET_IDX = np.array([
+    [LEFT_SHOULDER, LEFT_ELBOW, LEFT_WRIST],
+    [RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST],
+    [LEFT_HIP, LEFT_KNEE, LEFT_ANKLE],
+    [RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE],
+])
+
+
+def _angles_from_triplets(pts: np.ndarray) -> np.ndarray:
+    """Compute the vertex angle of each (point1, vertex, point3) triplet."""
+    v1 = pts[:, 0] - pts[:, 1]
+    v2 = pts[:, 2] - pts[:, 1]
+    cosine = (v1 * v2).sum(axis=-1) / np.sqrt(
+        (v1 * v1).sum(axis=-1) * (v2 * v2).sum(axis=-1)
+    )
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+# Numba is optional: when installed, a compiled branch-free kernel replaces
+# the NumPy implementation above; compilation is warmed up at import time so
+# the first frame does not pay the JIT cost
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+if _njit is not None:
+    @_njit(cache=True, fastmath=True)
+    def _angles_from_triplets(pts):  # noqa: F811
+        n = pts.shape[0]
+        out = np.empty(n, dtype=np.float32)
+        for i in range(n):
+            v1x = pts[i, 0, 0] - pts[i, 1, 0]
+            v1y = pts[i, 0, 1] - pts[i, 1, 1]
+            v2x = pts[i, 2, 0] - pts[i, 1, 0]
+            v2y = pts[i, 2, 1] - pts[i, 1, 1]
+            cosine = (v1x * v2x + v1y * v2y) / np.sqrt(
+                (v1x * v1x + v1y * v1y) * (v2x * v2x + v2y * v2y)
+            )
+            cosine = min(1.0, max(-1.0, cosine))
+            out[i] = np.degrees(np.arccos(cosine))
+        return out
+
+    _angles_from_triplets(
+        np.array([[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0]]], dtype=np.float32)
+    )
+
+
+def calculate_angles_batch(triplets: np.ndarray) -> np.ndarray:
+    """
+    Calculate angles for a batch of point triplets in one vectorized pass.
+
+    Args:
+        triplets: Array of shape (N, 3, 2) where each row is
+                  (point1, vertex, point3) in 2D coordinates
+
+    Returns:
+        Array of N angles in degrees
+    """
+    pts = np.ascontiguousarray(np.asarray(triplets, dtype=np.float32))
+    return _angles_from_triplets(pts)
+
+
 class PoseEstimator:
     """Handles pose detection and landmark extraction using MediaPipe."""
-    
-    def __init__(self, 
+
+    # Constructing mp.Pose loads model weights and initializes the inference
+    # backend; share one instance per parameter set across estimators.
+    # Each cached graph is reference-counted so closing one estimator
+    # does not pull it out from under the others, and carries a lock:
+    # mp.Pose is stateful and not thread-safe, so concurrent inference
+    # calls against the same graph must be serialized
+    _pose_cache: Dict[tuple, Any] = {}
+    _pose_refs: Dict[tuple, int] = {}
+    _pose_locks: Dict[tuple, threading.Lock] = {}
+
+    def __init__(self,
                  min_detection_confidence: float = 0.5,
-                 min_tracking_confidence: float = 0.5):
+                 min_tracking_confidence: float = 0.5,
+                 frame_skip: int = 1,
+                 model_complexity: int = 0,
+                 target_long_edge: int = 480,
+                 single_thread: bool = False):
         """
         Initialize the pose estimator.
-        
+
         Args:
             min_detection_confidence: Minimum confidence for pose detection
             min_tracking_confidence: Minimum confidence for pose tracking
+            frame_skip: Run full pose inference on every Nth frame and reuse
+                        the last landmarks in between (1 = every frame)
+            model_complexity: MediaPipe pose model complexity (0, 1 or 2);
+                              0 is the fastest and is accurate enough for
+                              angle-based exercise analysis
+            target_long_edge: Downscale frames so their long edge does not
+                              exceed this before inference (0 disables);
+                              MediaPipe resizes internally anyway, so large
+                              inputs only waste conversion bandwidth
+            single_thread: Cap OpenCV and OpenMP at one thread; set this
+                           when several estimators run in parallel
+                           processes so their internal pools do not
+                           oversubscribe the cores
         """
+        if single_thread:
+            # One estimator per core: internal parallelism would only
+            # fight the other workers for the same CPUs. OpenMP sizes its
+            # pool when the libraries load, so OMP_NUM_THREADS must be in
+            # the environment before this module is imported (the parallel
+            # path in offline_analysis sets it before building its pool);
+            # only the OpenCV cap can still be applied here
+            cv2.setNumThreads(1)
         self.mp_pose = mp.solutions.pose
         self.mp_drawing = mp.solutions.drawing_utils
-        self.pose = self.mp_pose.Pose(
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
+        # Resolve per-frame attribute chains once
+        self._pose_connections = self.mp_pose.POSE_CONNECTIONS
+        self._draw_landmarks = self.mp_drawing.draw_landmarks
+        self._pose_key = (
+            model_complexity, min_detection_confidence, min_tracking_confidence
         )
-        
+        pose = PoseEstimator._pose_cache.get(self._pose_key)
+        if pose is None:
+            pose = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=model_complexity,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+            PoseEstimator._pose_cache[self._pose_key] = pose
+        PoseEstimator._pose_refs[self._pose_key] = (
+            PoseEstimator._pose_refs.get(self._pose_key, 0) + 1
+        )
+        self.pose = pose
+        self._pose_lock = PoseEstimator._pose_locks.setdefault(
+            self._pose_key, threading.Lock()
+        )
+        # Per-thread scratch: the estimator itself is shared across
+        # Streamlit session threads (st.cache_resource hands every
+        # session the same instance), so the reusable buffers — RGB
+        # conversion output, the (33, 4) SoA landmark array, the angle
+        # triplets — and the frame-skip state all live in thread-local
+        # storage; each video stream runs on its own thread
+        self._tls = threading.local()
+        self.target_long_edge = target_long_edge
+        # Skip-frame stride: pose inference dominates per-frame cost, so
+        # callers can reuse the last result on intermediate frames
+        self.frame_skip = max(1, frame_skip)
+        # Offload the resize + color conversion to CUDA when OpenCV was
+        # built with it; otherwise stay on the CPU path
+        self._use_cuda = (
+            hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        )
+
+    def close(self):
+        """Release this estimator's reference to the shared pose graph.
+
+        The graph itself is only closed when the last estimator built
+        with the same parameters lets go of it, so a transient
+        `with PoseEstimator(...)` block cannot break a long-lived
+        instance sharing the cache entry.
+        """
+        if self.pose is None:
+            return
+        self.pose = None
+        refs = PoseEstimator._pose_refs.get(self._pose_key, 0) - 1
+        if refs > 0:
+            PoseEstimator._pose_refs[self._pose_key] = refs
+            return
+        PoseEstimator._pose_refs.pop(self._pose_key, None)
+        pose = PoseEstimator._pose_cache.pop(self._pose_key, None)
+        if pose is not None:
+            pose.close()
+
+    def __enter__(self) -> 'PoseEstimator':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _inference_size(self, frame: np.ndarray) -> Optional[Tuple[int, int]]:
+        """Return the (width, height) to downscale to, or None to keep as-is."""
+        if not self.target_long_edge:
+            return None
+        long_edge = max(frame.shape[:2])
+        if long_edge <= self.target_long_edge:
+            return None
+        scale = self.target_long_edge / long_edge
+        return (int(frame.shape[1] * scale), int(frame.shape[0] * scale))
+
+    def _preprocess_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscale and convert a BGR frame to RGB for pose inference.
+
+        Landmarks are normalized, so angle math and drawing on the
+        original-resolution frame are unaffected by the downscale.
+
+        Args:
+            frame: Input BGR frame
+
+        Returns:
+            RGB frame at inference resolution (a reused internal buffer)
+        """
+        new_size = self._inference_size(frame)
+
+        if self._use_cuda:
+            # Resize and convert on the GPU; only the small RGB result
+            # crosses back over the bus
+            gpu = getattr(self._tls, 'gpu_frame', None)
+            if gpu is None:
+                gpu = cv2.cuda_GpuMat()
+                self._tls.gpu_frame = gpu
+            gpu.upload(frame)
+            if new_size is not None:
+                gpu = cv2.cuda.resize(gpu, new_size, interpolation=cv2.INTER_AREA)
+            gpu = cv2.cuda.cvtColor(gpu, cv2.COLOR_BGR2RGB)
+            self._tls.rgb_buf = gpu.download()
+            return self._tls.rgb_buf
+
+        proc_frame = frame
+        if new_size is not None:
+            proc_frame = cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA)
+
+        rgb_buf = getattr(self._tls, 'rgb_buf', None)
+        if rgb_buf is None or rgb_buf.shape != proc_frame.shape:
+            rgb_buf = np.empty_like(proc_frame)
+            self._tls.rgb_buf = rgb_buf
+        cv2.cvtColor(proc_frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+        return rgb_buf
+
     def detect_pose(self, frame: np.ndarray) -> Optional[Dict[str, Any]]:
         """
         Detect pose landmarks in a frame.
@@ -39,47 +272,71 @@ class PoseEstimator:
         Returns:
             Dictionary containing pose landmarks and metadata, or None if no pose detected
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process the frame
-        results = self.pose.process(rgb_frame)
-        
+        # Reuse the last landmarks on skipped frames; MediaPipe's tracker
+        # keeps them valid for small inter-frame motion
+        frame_idx = getattr(self._tls, 'frame_idx', 0)
+        self._tls.frame_idx = frame_idx + 1
+        if self.frame_skip > 1 and frame_idx % self.frame_skip != 0:
+            return getattr(self._tls, 'last_pose_data', None)
+
+        rgb_frame = self._preprocess_frame(frame)
+
+        # Process the frame; the read-only flag lets MediaPipe skip its
+        # internal defensive copy. The graph itself is stateful and not
+        # thread-safe (and shared across estimators with the same
+        # parameters), so only the inference call is serialized
+        rgb_frame.flags.writeable = False
+        with self._pose_lock:
+            results = self.pose.process(rgb_frame)
+        rgb_frame.flags.writeable = True
+
         if results.pose_landmarks:
-            # Extract landmark coordinates
-            landmarks = []
-            for landmark in results.pose_landmarks.landmark:
-                landmarks.append({
-                    'x': landmark.x,
-                    'y': landmark.y,
-                    'z': landmark.z,
-                    'visibility': landmark.visibility
-                })
-            
-            return {
+            # Extract landmark data once per frame: the protobuf accessors
+            # are expensive, so downstream consumers index the cached
+            # (33, 4) array of (x, y, z, visibility) rows instead of
+            # re-reading attributes or chasing per-landmark dicts
+            landmarks = getattr(self._tls, 'lm_buf', None)
+            if landmarks is None:
+                landmarks = np.empty((NUM_LANDMARKS, 4), dtype=np.float32)
+                self._tls.lm_buf = landmarks
+            for i, landmark in enumerate(results.pose_landmarks.landmark):
+                landmarks[i, 0] = landmark.x
+                landmarks[i, 1] = landmark.y
+                landmarks[i, 2] = landmark.z
+                landmarks[i, 3] = landmark.visibility
+
+            pose_data = {
                 'landmarks': landmarks,
+                # (33, 2) x/y view into the same buffer for the angle path
+                'landmark_array': landmarks[:, :2],
                 'pose_landmarks': results.pose_landmarks,
                 'frame_shape': frame.shape
             }
-        
-        return None
+        else:
+            pose_data = None
+
+        self._tls.last_pose_data = pose_data
+        return pose_data
     
     def draw_landmarks(self, frame: np.ndarray, pose_data: Dict[str, Any]) -> np.ndarray:
         """
         Draw pose landmarks on the frame.
-        
+
+        The frame is annotated in place (no copy is made); the same array
+        is also returned for call-chaining convenience.
+
         Args:
-            frame: Input frame
+            frame: Input frame, mutated by the draw call
             pose_data: Pose detection results
-            
+
         Returns:
-            Frame with drawn landmarks
+            The input frame with drawn landmarks
         """
         if pose_data and 'pose_landmarks' in pose_data:
-            self.mp_drawing.draw_landmarks(
-                frame, 
-                pose_data['pose_landmarks'], 
-                self.mp_pose.POSE_CONNECTIONS
+            self._draw_landmarks(
+                frame,
+                pose_data['pose_landmarks'],
+                self._pose_connections
             )
         return frame
     
@@ -96,16 +353,18 @@ class PoseEstimator:
         """
         if not pose_data or 'landmarks' not in pose_data:
             return None
-            
-        if landmark_idx < len(pose_data['landmarks']):
-            landmark = pose_data['landmarks'][landmark_idx]
-            return (landmark['x'], landmark['y'])
-        
+
+        landmarks = pose_data['landmarks']
+        if landmark_idx < len(landmarks):
+            return (float(landmarks[landmark_idx, 0]),
+                    float(landmarks[landmark_idx, 1]))
+
         return None
     
-    def calculate_angle(self, point1: Tuple[float, float], 
-                       point2: Tuple[float, float], 
-                       point3: Tuple[float, float]) -> float:
+    @staticmethod
+    def calculate_angle(point1: Tuple[float, float],
+                        point2: Tuple[float, float],
+                        point3: Tuple[float, float]) -> float:
         """
         Calculate angle between three points.
         
@@ -117,84 +376,94 @@ class PoseEstimator:
         Returns:
             Angle in degrees
         """
-        # Convert to numpy arrays
-        a = np.array(point1)
-        b = np.array(point2)
-        c = np.array(point3)
-        
-        # Calculate vectors
-        ba = a - b
-        bc = c - b
-        
-        # Calculate angle
-        cosine_angle = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-        angle = np.arccos(np.clip(cosine_angle, -1.0, 1.0))
-        
-        return np.degrees(angle)
+        # Scalar math: building an ndarray for a single 2D triplet costs
+        # more than the angle computation itself
+        ax, ay = point1[0] - point2[0], point1[1] - point2[1]
+        bx, by = point3[0] - point2[0], point3[1] - point2[1]
+
+        cosine = (ax * bx + ay * by) / (
+            math.hypot(ax, ay) * math.hypot(bx, by) + 1e-12
+        )
+        cosine = min(1.0, max(-1.0, cosine))
+
+        return math.degrees(math.acos(cosine))
     
+    def analyze_frame(self, frame: np.ndarray) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Detect the pose and compute the key angles in one call.
+
+        Fusing the two per-frame stages keeps the landmark array hot
+        between detection and the angle kernel and saves callers a
+        Python-level round-trip per frame.
+
+        Args:
+            frame: Input video frame
+
+        Returns:
+            Tuple of (pose_data, angles) where angles is the fixed-order
+            key-angle array; both are None when no pose was detected
+        """
+        pose_data = self.detect_pose(frame)
+        if pose_data is None:
+            return None, None
+        return pose_data, self.get_key_angles_array(pose_data)
+
+    def get_key_angles_array(self, pose_data: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Calculate the key body angles as a fixed-order array.
+
+        The order matches _KEY_ANGLE_NAMES (indexable via the L_ARM,
+        R_ARM, L_LEG, R_LEG constants); consumers on the per-frame hot
+        path index this array instead of hashing dictionary keys.
+
+        Args:
+            pose_data: Pose detection results
+
+        Returns:
+            Array of shape (4,) with the angles in degrees, or None if
+            the pose data carries no usable landmarks
+        """
+        if not pose_data or 'landmarks' not in pose_data:
+            return None
+
+        landmark_array = pose_data.get('landmark_array')
+        if landmark_array is None:
+            # Fallback for callers that built pose_data without the x/y view
+            landmark_array = np.asarray(
+                pose_data['landmarks'], dtype=np.float32
+            )[:, :2]
+
+        # A detected pose always carries the full 33-landmark set; anything
+        # shorter means malformed input, not a recoverable condition
+        if len(landmark_array) < NUM_LANDMARKS:
+            return None
+
+        # Gather every triplet with one fancy-index read, then compute
+        # all angles in a single batched call
+        triplet_buf = getattr(self._tls, 'triplet_buf', None)
+        if triplet_buf is None:
+            triplet_buf = np.empty((4, 3, 2), dtype=np.float32)
+            self._tls.triplet_buf = triplet_buf
+        triplet_buf[:] = landmark_array[_KEY_ANGLE_TRIPLET_IDX]
+        return calculate_angles_batch(triplet_buf)
+
     def get_key_angles(self, pose_data: Dict[str, Any]) -> Dict[str, float]:
         """
         Calculate key body angles for exercise analysis.
-        
+
         Args:
             pose_data: Pose detection results
-            
+
         Returns:
             Dictionary of calculated angles
         """
         angles = {}
-        
-        if not pose_data or 'landmarks' not in pose_data:
+
+        batch_angles = self.get_key_angles_array(pose_data)
+        if batch_angles is None:
             return angles
-        
-        # Define landmark indices
-        LEFT_SHOULDER = 11
-        LEFT_ELBOW = 13
-        LEFT_WRIST = 15
-        RIGHT_SHOULDER = 12
-        RIGHT_ELBOW = 14
-        RIGHT_WRIST = 16
-        LEFT_HIP = 23
-        LEFT_KNEE = 25
-        LEFT_ANKLE = 27
-        RIGHT_HIP = 24
-        RIGHT_KNEE = 26
-        RIGHT_ANKLE = 28
-        
-        try:
-            # Left arm angle (shoulder-elbow-wrist)
-            left_shoulder = self.get_landmark_coords(pose_data, LEFT_SHOULDER)
-            left_elbow = self.get_landmark_coords(pose_data, LEFT_ELBOW)
-            left_wrist = self.get_landmark_coords(pose_data, LEFT_WRIST)
-            
-            if all([left_shoulder, left_elbow, left_wrist]):
-                angles['left_arm'] = self.calculate_angle(left_shoulder, left_elbow, left_wrist)
-            
-            # Right arm angle
-            right_shoulder = self.get_landmark_coords(pose_data, RIGHT_SHOULDER)
-            right_elbow = self.get_landmark_coords(pose_data, RIGHT_ELBOW)
-            right_wrist = self.get_landmark_coords(pose_data, RIGHT_WRIST)
-            
-            if all([right_shoulder, right_elbow, right_wrist]):
-                angles['right_arm'] = self.calculate_angle(right_shoulder, right_elbow, right_wrist)
-            
-            # Left leg angle (hip-knee-ankle)
-            left_hip = self.get_landmark_coords(pose_data, LEFT_HIP)
-            left_knee = self.get_landmark_coords(pose_data, LEFT_KNEE)
-            left_ankle = self.get_landmark_coords(pose_data, LEFT_ANKLE)
-            
-            if all([left_hip, left_knee, left_ankle]):
-                angles['left_leg'] = self.calculate_angle(left_hip, left_knee, left_ankle)
-            
-            # Right leg angle
-            right_hip = self.get_landmark_coords(pose_data, RIGHT_HIP)
-            right_knee = self.get_landmark_coords(pose_data, RIGHT_KNEE)
-            right_ankle = self.get_landmark_coords(pose_data, RIGHT_ANKLE)
-            
-            if all([right_hip, right_knee, right_ankle]):
-                angles['right_leg'] = self.calculate_angle(right_hip, right_knee, right_ankle)
-                
-        except Exception as e:
-            print(f"Error calculating angles: {e}")
-        
+
+        for name, angle in zip(_KEY_ANGLE_NAMES, batch_angles):
+            angles[name] = float(angle)
+
         return angles
\ No newline at end of file
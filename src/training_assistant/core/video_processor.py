@@ -5,20 +5,44 @@ Video processing module for handling camera feed and MP4 files.
 import cv2
 import numpy as np
 from typing import Generator, Optional, Tuple, Dict, Any
+import re
+import shutil
 import tempfile
+import threading
+import queue
 import os
 
+# Corrective feedback keywords rendered in red on the HUD; precompiled so
+# classification needs no per-call lowercasing or repeated substring scans
+_NEG_FEEDBACK_RE = re.compile(r'\b(?:deeper|lower|symmetric|balance)\b', re.I)
+
 
 class VideoProcessor:
     """Handles video input from camera or MP4 files."""
     
-    def __init__(self):
-        """Initialize the video processor."""
+    def __init__(self, frame_stride: int = 1):
+        """
+        Initialize the video processor.
+
+        Args:
+            frame_stride: Deliver every Nth frame; skipped frames are
+                          advanced with grab() and never decoded
+        """
         self.cap = None
         self.is_camera = False
         self.total_frames = 0
         self.current_frame = 0
         self.fps = 30
+        self.frame_stride = max(1, frame_stride)
+        # Latest-frame buffer for the camera: a background thread keeps
+        # grabbing so the driver queue never backs up, and consumers
+        # always see the freshest frame instead of a stale one
+        self._latest_frame = None
+        self._latest_lock = threading.Lock()
+        self._frame_ready = threading.Event()
+        self._frame_wanted = threading.Event()
+        self._grab_thread = None
+        self._grab_stop = False
         
     def open_camera(self, camera_index: int = 0) -> bool:
         """
@@ -34,8 +58,36 @@ class VideoProcessor:
         if self.cap.isOpened():
             self.is_camera = True
             self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+            # Shrink the driver-side queue; multi-frame buffers add
+            # ~100 ms of latency between the user and the feedback
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._grab_stop = False
+            self._grab_thread = threading.Thread(
+                target=self._camera_grab_loop, daemon=True
+            )
+            self._grab_thread.start()
             return True
         return False
+
+    def _camera_grab_loop(self):
+        """Continuously grab camera frames, decoding only on demand.
+
+        grab() advances the stream without decoding, so frames the
+        consumer never asks for cost nothing; retrieve() runs only when
+        get_frame is waiting, and always decodes the newest grab.
+        """
+        while not self._grab_stop and self.cap is not None:
+            if not self.cap.grab():
+                break
+            if not self._frame_wanted.is_set():
+                continue
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                break
+            self._frame_wanted.clear()
+            with self._latest_lock:
+                self._latest_frame = frame
+            self._frame_ready.set()
     
     def open_video_file(self, file_path: str) -> bool:
         """
@@ -49,9 +101,20 @@ class VideoProcessor:
         """
         if not os.path.exists(file_path):
             return False
-            
-        self.cap = cv2.VideoCapture(file_path)
+
+        # Let FFmpeg decode with all its threads; the variable is only
+        # read when the capture is constructed, so set it first
+        os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "threads;auto")
+        self.cap = cv2.VideoCapture(file_path, cv2.CAP_FFMPEG)
+        if not self.cap.isOpened():
+            # Some builds lack the FFmpeg backend; retry with autodetect
+            self.cap = cv2.VideoCapture(file_path)
         if self.cap.isOpened():
+            # Opportunistic hardware decode; OpenCV silently stays on the
+            # software path when no accelerator is available
+            if hasattr(cv2, 'VIDEO_ACCELERATION_ANY'):
+                self.cap.set(cv2.CAP_PROP_HW_ACCELERATION,
+                             cv2.VIDEO_ACCELERATION_ANY)
             self.is_camera = False
             self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
             self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
@@ -68,7 +131,25 @@ class VideoProcessor:
         """
         if not self.cap or not self.cap.isOpened():
             return None
-            
+
+        if self.is_camera:
+            # Ask the grab thread to decode its next grab and wait for
+            # it; every frame grabbed while we were busy was skipped
+            # without ever being decoded
+            self._frame_ready.clear()
+            self._frame_wanted.set()
+            if not self._frame_ready.wait(timeout=1.0):
+                return None
+            with self._latest_lock:
+                return self._latest_frame
+
+        # Advance past skipped frames without paying their decode cost
+        for _ in range(self.frame_stride - 1):
+            if not self.cap.grab():
+                return None
+            if not self.is_camera:
+                self.current_frame += 1
+
         ret, frame = self.cap.read()
         if ret:
             if not self.is_camera:
@@ -122,6 +203,13 @@ class VideoProcessor:
     
     def close(self):
         """Close the video source."""
+        if self._grab_thread is not None:
+            self._grab_stop = True
+            self._grab_thread.join(timeout=1.0)
+            self._grab_thread = None
+        self._latest_frame = None
+        self._frame_ready.clear()
+        self._frame_wanted.clear()
         if self.cap:
             self.cap.release()
             self.cap = None
@@ -131,21 +219,112 @@ class VideoProcessor:
         self.close()
 
 
+class ThreadedFrameReader:
+    """Reads frames from a video source on a background thread.
+
+    Decoding and pose inference otherwise stall each other when run
+    serially; prefetching frames through a bounded queue overlaps the
+    decode I/O with the downstream compute stage.
+    """
+
+    def __init__(self, video_processor: VideoProcessor, prefetch: int = 8):
+        """
+        Initialize the threaded reader.
+
+        Args:
+            video_processor: Opened video source to read frames from
+            prefetch: Maximum number of decoded frames to buffer ahead
+        """
+        self.video_processor = video_processor
+        self._queue = queue.Queue(maxsize=prefetch)
+        self._thread = None
+        self._stopped = False
+
+    def start(self) -> 'ThreadedFrameReader':
+        """Start the background reader thread."""
+        self._thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader_loop(self):
+        """Read frames until the source is exhausted, then push a sentinel."""
+        while not self._stopped:
+            frame = self.video_processor.get_frame()
+            self._queue.put(frame)
+            if frame is None:
+                break
+
+    def frames(self) -> Generator[np.ndarray, None, None]:
+        """Yield decoded frames until the source is exhausted."""
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            yield frame
+
+    def stop(self):
+        """Stop the reader thread and wait for it to exit.
+
+        Callers release the underlying capture right after this returns,
+        so the reader must not still be inside get_frame() when they do.
+        Draining the queue unblocks a reader stuck on a full put; the
+        join then makes the handoff safe.
+        """
+        self._stopped = True
+        if self._thread is None:
+            return
+        for _ in range(20):  # ~2s worst case; the thread is a daemon
+            while not self._queue.empty():
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._thread.join(timeout=0.1)
+            if not self._thread.is_alive():
+                break
+        self._thread = None
+
+
+# Shared CLAHE instance: createCLAHE allocates per-tile histogram state,
+# so building it once beats reconstructing it for every frame
+_CLAHE = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+
 class FrameProcessor:
     """Handles frame preprocessing and optimization."""
-    
-    @staticmethod
-    def resize_frame(frame: np.ndarray, 
-                    target_width: int = 640, 
-                    maintain_aspect: bool = True) -> np.ndarray:
+
+    # Reusable output buffers for the per-frame pipeline stages; frame
+    # geometry is constant within a session, so each stage allocates once
+    # and then writes in place via OpenCV's dst= parameter. The buffers
+    # live in thread-local storage: Streamlit serves each browser session
+    # on its own thread, and an upload analysis must not overwrite the
+    # in-flight frames of another session's camera loop
+    _tls = threading.local()
+
+    @classmethod
+    def _scratch_buf(cls, name: str, shape: tuple, dtype) -> np.ndarray:
+        """Return the named per-thread buffer, reallocating on shape change."""
+        buf = getattr(cls._tls, name, None)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            setattr(cls._tls, name, buf)
+        return buf
+
+    @classmethod
+    def resize_frame(cls, frame: np.ndarray,
+                     target_width: int = 640,
+                     maintain_aspect: bool = True) -> np.ndarray:
         """
         Resize frame for processing optimization.
-        
+
+        The result is written into a reused per-thread buffer, so the
+        returned array is only valid until this thread's next call.
+
         Args:
             frame: Input frame
             target_width: Target width for resizing
             maintain_aspect: Whether to maintain aspect ratio
-            
+
         Returns:
             Resized frame
         """
@@ -153,91 +332,184 @@ class FrameProcessor:
             height, width = frame.shape[:2]
             aspect_ratio = height / width
             target_height = int(target_width * aspect_ratio)
-            return cv2.resize(frame, (target_width, target_height))
         else:
-            return cv2.resize(frame, (target_width, target_width))
-    
-    @staticmethod
-    def enhance_frame(frame: np.ndarray) -> np.ndarray:
+            target_height = target_width
+
+        dst = cls._scratch_buf(
+            '_resize_buf', (target_height, target_width) + frame.shape[2:],
+            frame.dtype
+        )
+        cv2.resize(frame, (target_width, target_height), dst=dst)
+        return dst
+
+    @classmethod
+    def enhance_frame(cls, frame: np.ndarray) -> np.ndarray:
         """
         Enhance frame quality for better pose detection.
-        
+
+        The result is written into a reused per-thread buffer, so the
+        returned array is only valid until this thread's next call.
+
         Args:
             frame: Input frame
-            
+
         Returns:
             Enhanced frame
         """
         # Convert to LAB color space for better lighting normalization
-        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-        
-        # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-        
+        lab = cls._scratch_buf('_lab_buf', frame.shape, frame.dtype)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=lab)
+
+        # Apply the shared CLAHE instance to the L channel; CLAHE needs a
+        # contiguous single-channel image, so stage it through a persistent
+        # buffer instead of letting OpenCV copy the strided view and
+        # allocate a fresh result every frame
+        l_chan = cls._scratch_buf('_l_buf', frame.shape[:2], frame.dtype)
+        cv2.extractChannel(lab, 0, dst=l_chan)
+        _CLAHE.apply(l_chan, dst=l_chan)
+        cv2.insertChannel(l_chan, lab, 0)
+
         # Convert back to BGR
-        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-        
+        enhanced = cls._scratch_buf('_enhanced_buf', frame.shape, frame.dtype)
+        cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=enhanced)
+
         return enhanced
-    
-    @staticmethod
-    def add_info_overlay(frame: np.ndarray, 
-                        rep_count: int, 
-                        exercise_type: str,
-                        current_phase: str,
-                        form_feedback: list,
-                        angle: Optional[float] = None) -> np.ndarray:
+
+    # Lighting probe state for maybe_enhance_frame: CLAHE plus two color
+    # conversions can outweigh pose inference, so the decision to enhance
+    # is made from a thumbnail and only refreshed every few frames. The
+    # frame counter and verdict are per-thread like the buffers, since
+    # each session's video stream probes its own lighting
+    _ENHANCE_RECHECK_FRAMES = 30
+    _BRIGHTNESS_OK_RANGE = (80, 180)
+
+    @classmethod
+    def maybe_enhance_frame(cls, frame: np.ndarray) -> np.ndarray:
         """
-        Add information overlay to the frame.
-        
+        Enhance the frame only when a cheap brightness probe flags it.
+
+        A 64x36 grayscale thumbnail is sampled every
+        _ENHANCE_RECHECK_FRAMES frames; well-lit sources skip the CLAHE
+        pass entirely, which costs more than pose inference on some CPUs.
+
         Args:
             frame: Input frame
-            rep_count: Current repetition count
-            exercise_type: Type of exercise
-            current_phase: Current phase of exercise
-            form_feedback: List of feedback messages
-            angle: Current angle measurement
-            
+
         Returns:
-            Frame with overlay information
+            Enhanced frame (a reused buffer, valid until the next call)
+            when lighting is poor, otherwise the input frame unchanged
         """
-        overlay_frame = frame.copy()
-        height, width = frame.shape[:2]
-        
-        # Define colors
+        frame_idx = getattr(cls._tls, '_enhance_frame_idx', 0)
+        if frame_idx % cls._ENHANCE_RECHECK_FRAMES == 0:
+            probe = cls._scratch_buf('_probe_buf', (36, 64) + frame.shape[2:],
+                                     frame.dtype)
+            cv2.resize(frame, (64, 36), dst=probe,
+                       interpolation=cv2.INTER_AREA)
+            gray = cls._scratch_buf('_probe_gray_buf', (36, 64), frame.dtype)
+            cv2.cvtColor(probe, cv2.COLOR_BGR2GRAY, dst=gray)
+            low, high = cls._BRIGHTNESS_OK_RANGE
+            cls._tls._enhance_needed = not (low <= cv2.mean(gray)[0] <= high)
+        cls._tls._enhance_frame_idx = frame_idx + 1
+
+        if getattr(cls._tls, '_enhance_needed', False):
+            return cls.enhance_frame(frame)
+        return frame
+
+    # HUD panel region on the frame: (10, 10) to (400, 200)
+    _HUD_ORIGIN = (10, 10)
+    _HUD_SIZE = (190, 390)  # (height, width)
+
+    # Cached pre-rendered HUD: (key, panel, text_mask); font rasterization
+    # only reruns when a displayed value actually changes. Held per
+    # thread so concurrent sessions do not swap panels under each other
+
+    @classmethod
+    def _render_hud_panel(cls,
+                          rep_count: int,
+                          exercise_type: str,
+                          current_phase: str,
+                          form_feedback: tuple,
+                          angle_text: Optional[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Render the HUD text onto a black panel and return it with a text mask."""
         GREEN = (0, 255, 0)
         RED = (0, 0, 255)
         BLUE = (255, 0, 0)
         WHITE = (255, 255, 255)
-        BLACK = (0, 0, 0)
-        
-        # Add semi-transparent background for text
-        overlay = overlay_frame.copy()
-        cv2.rectangle(overlay, (10, 10), (400, 200), BLACK, -1)
-        cv2.addWeighted(overlay, 0.7, overlay_frame, 0.3, 0, overlay_frame)
-        
-        # Add exercise info
-        cv2.putText(overlay_frame, f"Exercise: {exercise_type.title()}", 
-                   (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, WHITE, 2)
-        
-        cv2.putText(overlay_frame, f"Reps: {rep_count}", 
-                   (20, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, GREEN, 2)
-        
-        cv2.putText(overlay_frame, f"Phase: {current_phase.title()}", 
-                   (20, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, BLUE, 2)
-        
-        if angle is not None:
-            cv2.putText(overlay_frame, f"Angle: {angle:.1f}°", 
-                       (20, 130), cv2.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 2)
-        
+
+        panel = np.zeros((*cls._HUD_SIZE, 3), dtype=np.uint8)
+
+        cv2.putText(panel, f"Exercise: {exercise_type.title()}",
+                    (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, WHITE, 2)
+
+        cv2.putText(panel, f"Reps: {rep_count}",
+                    (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, GREEN, 2)
+
+        cv2.putText(panel, f"Phase: {current_phase.title()}",
+                    (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.6, BLUE, 2)
+
+        if angle_text is not None:
+            cv2.putText(panel, angle_text,
+                        (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 2)
+
         # Add form feedback
-        y_offset = 160
+        y_offset = 150
         for i, feedback in enumerate(form_feedback[:2]):  # Show max 2 feedback messages
-            color = RED if any(word in feedback.lower() for word in ['deeper', 'lower', 'symmetric', 'balance']) else GREEN
-            cv2.putText(overlay_frame, feedback, 
-                       (20, y_offset + i * 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-        
-        return overlay_frame
+            color = RED if _NEG_FEEDBACK_RE.search(feedback) else GREEN
+            cv2.putText(panel, feedback,
+                        (10, y_offset + i * 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+
+        text_mask = panel.any(axis=2, keepdims=True)
+        return panel, text_mask
+
+    @classmethod
+    def add_info_overlay(cls,
+                         frame: np.ndarray,
+                         rep_count: int,
+                         exercise_type: str,
+                         current_phase: str,
+                         form_feedback: list,
+                         angle: Optional[float] = None) -> np.ndarray:
+        """
+        Add information overlay to the frame.
+
+        The HUD is blended into the frame in place (no copy is made);
+        the same array is also returned for call-chaining convenience.
+
+        Args:
+            frame: Input frame, mutated by the blend
+            rep_count: Current repetition count
+            exercise_type: Type of exercise
+            current_phase: Current phase of exercise
+            form_feedback: List of feedback messages
+            angle: Current angle measurement
+
+        Returns:
+            The input frame with overlay information
+        """
+        # Re-render the HUD only when one of the displayed values changed
+        angle_text = f"Angle: {angle:.1f}°" if angle is not None else None
+        key = (rep_count, exercise_type, current_phase,
+               tuple(form_feedback[:2]), angle_text)
+
+        cached_key, panel, text_mask = getattr(cls._tls, '_hud_cache',
+                                               (None, None, None))
+        if key != cached_key:
+            panel, text_mask = cls._render_hud_panel(
+                rep_count, exercise_type, current_phase,
+                tuple(form_feedback[:2]), angle_text
+            )
+            cls._tls._hud_cache = (key, panel, text_mask)
+
+        # Darken the HUD region in place, then blit the pre-rendered text
+        # on top; only the ROI is touched, never the whole frame
+        y, x = cls._HUD_ORIGIN
+        h, w = cls._HUD_SIZE
+        roi = frame[y:y + h, x:x + w]
+        rh, rw = roi.shape[:2]  # clip for frames smaller than the HUD
+        cv2.addWeighted(panel[:rh, :rw], 0.7, roi, 0.3, 0, dst=roi)
+        np.copyto(roi, panel[:rh, :rw], where=text_mask[:rh, :rw])
+
+        return frame
     
     @staticmethod
     def save_frame_as_image(frame: np.ndarray, filename: str) -> bool:
@@ -268,7 +540,14 @@ def create_temp_video_file(uploaded_file) -> str:
     Returns:
         Path to temporary file
     """
+    # OpenCV's VideoCapture needs a real filesystem path, so an in-memory
+    # spooled file is not an option; make sure the bytes are durably on
+    # disk before the decoder opens the path
     temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-    temp_file.write(uploaded_file.read())
+    # Stream in 1 MiB chunks rather than read() the whole upload into
+    # one bytes object; memory stays constant regardless of video size
+    shutil.copyfileobj(uploaded_file, temp_file, length=1 << 20)
+    temp_file.flush()
+    os.fsync(temp_file.fileno())
     temp_file.close()
     return temp_file.name
\ No newline at end of file
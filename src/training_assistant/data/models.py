@@ -4,11 +4,27 @@ Data models for training sessions and storage.
 
 import sqlite3
 import json
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
+from functools import cached_property
 import os
 
+# orjson is optional: it parses the numeric rep_times arrays several
+# times faster than the stdlib; fall back to json when not installed
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def _json_loads(text):
+    """Parse a JSON column value with the fastest available parser."""
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
 
 @dataclass
 class WorkoutSession:
@@ -33,6 +49,11 @@ class WorkoutSession:
         if self.start_time is None:
             self.start_time = datetime.now()
 
+    @cached_property
+    def display_name(self) -> str:
+        """Titled exercise name, computed once per session object."""
+        return self.exercise_type.title()
+
 
 @dataclass
 class ExerciseStats:
@@ -48,6 +69,37 @@ class ExerciseStats:
     average_form_score: float = 0.0
     last_session_date: Optional[datetime] = None
 
+    # Display strings are cached on first access: stats objects are built
+    # fresh per query and only read afterwards, so the UI can reuse the
+    # formatted values across reruns instead of re-formatting every field
+
+    @cached_property
+    def display_name(self) -> str:
+        """Titled exercise name, computed once per stats object."""
+        return self.exercise_type.title()
+
+    @cached_property
+    def total_reps_str(self) -> str:
+        """Thousands-separated rep total for display."""
+        return f"{self.total_reps:,}"
+
+    @cached_property
+    def total_duration_min_str(self) -> str:
+        """Total duration formatted in minutes."""
+        return f"{self.total_duration / 60:.1f} min"
+
+    @cached_property
+    def avg_duration_min_str(self) -> str:
+        """Average session duration formatted in minutes."""
+        return f"{self.average_session_duration / 60:.1f} min"
+
+    @cached_property
+    def last_session_str(self) -> str:
+        """Last session date as YYYY-MM-DD, or 'Never'."""
+        if self.last_session_date is None:
+            return 'Never'
+        return self.last_session_date.strftime('%Y-%m-%d')
+
 
 class WorkoutDatabase:
     """Handles workout data storage and retrieval."""
@@ -61,11 +113,27 @@ class WorkoutDatabase:
         """
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # Persistent connection: WAL avoids a full fsync per insert and
+        # lets readers run alongside writers
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        # Named column access without the positional-index fragility;
+        # sqlite3.Row is implemented in C and costs nothing over tuples
+        self._conn.row_factory = sqlite3.Row
+        # Transaction state lives on the connection, so two threads
+        # entering `with self._conn:` at once would share one open
+        # transaction and commit each other's half-written data. Writes
+        # take this lock; reads stay lock-free under WAL
+        self._write_lock = threading.Lock()
+
         self._create_tables()
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS workout_sessions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -98,7 +166,33 @@ class WorkoutDatabase:
                     updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-    
+
+            # Per-rep rows for incremental saves: appending reps one JSON
+            # blob at a time rewrites the whole list on every save, so
+            # progressive workflows write here instead and the JSON column
+            # stays as the session-end snapshot for legacy readers
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_reps (
+                    session_id INTEGER NOT NULL,
+                    rep_idx INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    PRIMARY KEY (session_id, rep_idx)
+                )
+            """)
+
+            # The session queries all ORDER BY start_time DESC (optionally
+            # filtered by exercise); start_time is ISO-8601 text, which
+            # sorts lexicographically, so these indices serve both the
+            # filter and the ordering without a scan-and-sort
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ws_exercise_start
+                ON workout_sessions(exercise_type, start_time DESC)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ws_start
+                ON workout_sessions(start_time DESC)
+            """)
+
     def save_session(self, session: WorkoutSession) -> int:
         """
         Save a workout session to the database.
@@ -109,36 +203,93 @@ class WorkoutDatabase:
         Returns:
             ID of the saved session
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO workout_sessions (
-                    exercise_type, start_time, end_time, total_reps,
-                    duration_seconds, average_form_score, input_source,
-                    notes, rep_times, form_feedback_history
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session.exercise_type,
-                session.start_time.isoformat() if session.start_time else None,
-                session.end_time.isoformat() if session.end_time else None,
-                session.total_reps,
-                session.duration_seconds,
-                session.average_form_score,
-                session.input_source,
-                session.notes,
-                json.dumps(session.rep_times),
-                json.dumps(session.form_feedback_history)
-            ))
-            
-            session_id = cursor.lastrowid
-            session.id = session_id
-            
-            # Update exercise statistics
-            self._update_exercise_stats(session)
-            
-            return session_id
+        with self._write_lock, self._conn:
+            session_id = self._insert_session(session)
+        return session_id
+
+    def save_sessions(self, sessions: List[WorkoutSession]) -> List[int]:
+        """
+        Save multiple workout sessions inside a single transaction.
+
+        Args:
+            sessions: WorkoutSession objects to save
+
+        Returns:
+            IDs of the saved sessions
+        """
+        with self._write_lock, self._conn:
+            return [self._insert_session(session) for session in sessions]
+
+    _INSERT_SESSION_SQL = """
+        INSERT INTO workout_sessions (
+            exercise_type, start_time, end_time, total_reps,
+            duration_seconds, average_form_score, input_source,
+            notes, rep_times, form_feedback_history
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def _insert_session(self, session: WorkoutSession) -> int:
+        """Insert a session row and update stats; caller owns the transaction."""
+        cursor = self._conn.execute(self._INSERT_SESSION_SQL, (
+            session.exercise_type,
+            session.start_time.isoformat() if session.start_time else None,
+            session.end_time.isoformat() if session.end_time else None,
+            session.total_reps,
+            session.duration_seconds,
+            session.average_form_score,
+            session.input_source,
+            session.notes,
+            json.dumps(session.rep_times),
+            json.dumps(session.form_feedback_history)
+        ))
+
+        session_id = cursor.lastrowid
+        session.id = session_id
+
+        # Update exercise statistics
+        self._update_exercise_stats(session)
+
+        return session_id
     
+    def append_reps(self, session_id: int, reps: List[float],
+                    start_idx: int = 0) -> None:
+        """
+        Append per-rep durations for a session in one batch insert.
+
+        Unlike rewriting the rep_times JSON column, this is O(len(reps))
+        per call regardless of how many reps the session already has,
+        so it can be called after every rep without quadratic cost.
+
+        Args:
+            session_id: ID of the session the reps belong to
+            reps: Rep durations in seconds
+            start_idx: Index of the first rep in the batch, for callers
+                       that flush incrementally
+        """
+        with self._write_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO session_reps VALUES (?, ?, ?)",
+                ((session_id, start_idx + i, duration)
+                 for i, duration in enumerate(reps))
+            )
+
+    def get_session_reps(self, session_id: int) -> List[float]:
+        """
+        Read back the per-rep durations stored for a session.
+
+        Args:
+            session_id: ID of the session
+
+        Returns:
+            Rep durations in rep order
+        """
+        cursor = self._conn.execute("""
+            SELECT duration FROM session_reps
+            WHERE session_id = ?
+            ORDER BY rep_idx
+        """, (session_id,))
+        return [row['duration'] for row in cursor.fetchall()]
+
     def get_session(self, session_id: int) -> Optional[WorkoutSession]:
         """
         Retrieve a workout session by ID.
@@ -149,16 +300,14 @@ class WorkoutDatabase:
         Returns:
             WorkoutSession object or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM workout_sessions WHERE id = ?
-            """, (session_id,))
-            
-            row = cursor.fetchone()
-            if row:
-                return self._row_to_session(row)
-        
+        cursor = self._conn.execute("""
+            SELECT * FROM workout_sessions WHERE id = ?
+        """, (session_id,))
+
+        row = cursor.fetchone()
+        if row:
+            return self._row_to_session(row)
+
         return None
     
     def get_recent_sessions(self, limit: int = 10) -> List[WorkoutSession]:
@@ -171,16 +320,38 @@ class WorkoutDatabase:
         Returns:
             List of recent WorkoutSession objects
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM workout_sessions 
-                ORDER BY start_time DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            return [self._row_to_session(row) for row in cursor.fetchall()]
+        cursor = self._conn.execute("""
+            SELECT * FROM workout_sessions
+            ORDER BY start_time DESC
+            LIMIT ?
+        """, (limit,))
+
+        return [self._row_to_session(row) for row in cursor.fetchall()]
     
+    def get_sessions_since(self, start_time: datetime, limit: int = 100) -> List[WorkoutSession]:
+        """
+        Get sessions that started on or after a given time.
+
+        Filtering in SQL keeps rows outside the window from ever being
+        fetched and deserialized; start_time is stored as ISO-8601 text,
+        which compares lexicographically in date order.
+
+        Args:
+            start_time: Earliest session start to include
+            limit: Maximum number of sessions to return
+
+        Returns:
+            List of WorkoutSession objects, newest first
+        """
+        cursor = self._conn.execute("""
+            SELECT * FROM workout_sessions
+            WHERE start_time >= ?
+            ORDER BY start_time DESC
+            LIMIT ?
+        """, (start_time.isoformat(), limit))
+
+        return [self._row_to_session(row) for row in cursor.fetchall()]
+
     def get_sessions_by_exercise(self, exercise_type: str, limit: int = 50) -> List[WorkoutSession]:
         """
         Get sessions for a specific exercise type.
@@ -192,16 +363,14 @@ class WorkoutDatabase:
         Returns:
             List of WorkoutSession objects
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM workout_sessions 
-                WHERE exercise_type = ?
-                ORDER BY start_time DESC 
-                LIMIT ?
-            """, (exercise_type, limit))
-            
-            return [self._row_to_session(row) for row in cursor.fetchall()]
+        cursor = self._conn.execute("""
+            SELECT * FROM workout_sessions
+            WHERE exercise_type = ?
+            ORDER BY start_time DESC
+            LIMIT ?
+        """, (exercise_type, limit))
+
+        return [self._row_to_session(row) for row in cursor.fetchall()]
     
     def get_exercise_stats(self, exercise_type: str) -> Optional[ExerciseStats]:
         """
@@ -213,27 +382,14 @@ class WorkoutDatabase:
         Returns:
             ExerciseStats object or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM exercise_stats WHERE exercise_type = ?
-            """, (exercise_type,))
-            
-            row = cursor.fetchone()
-            if row:
-                return ExerciseStats(
-                    exercise_type=row[0],
-                    total_sessions=row[1],
-                    total_reps=row[2],
-                    total_duration=row[3],
-                    average_reps_per_session=row[4],
-                    average_session_duration=row[5],
-                    best_session_reps=row[6],
-                    best_session_duration=row[7],
-                    average_form_score=row[8],
-                    last_session_date=datetime.fromisoformat(row[9]) if row[9] else None
-                )
-        
+        cursor = self._conn.execute("""
+            SELECT * FROM exercise_stats WHERE exercise_type = ?
+        """, (exercise_type,))
+
+        row = cursor.fetchone()
+        if row:
+            return self._row_to_stats(row)
+
         return None
     
     def get_all_exercise_stats(self) -> List[ExerciseStats]:
@@ -243,107 +399,108 @@ class WorkoutDatabase:
         Returns:
             List of ExerciseStats objects
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM exercise_stats ORDER BY total_sessions DESC")
-            
-            stats = []
-            for row in cursor.fetchall():
-                stats.append(ExerciseStats(
-                    exercise_type=row[0],
-                    total_sessions=row[1],
-                    total_reps=row[2],
-                    total_duration=row[3],
-                    average_reps_per_session=row[4],
-                    average_session_duration=row[5],
-                    best_session_reps=row[6],
-                    best_session_duration=row[7],
-                    average_form_score=row[8],
-                    last_session_date=datetime.fromisoformat(row[9]) if row[9] else None
-                ))
-            
-            return stats
+        cursor = self._conn.execute(
+            "SELECT * FROM exercise_stats ORDER BY total_sessions DESC"
+        )
+
+        stats = []
+        for row in cursor.fetchall():
+            stats.append(self._row_to_stats(row))
+
+        return stats
     
-    def _row_to_session(self, row) -> WorkoutSession:
+    def get_least_practiced_exercise(self) -> Optional[ExerciseStats]:
+        """
+        Get the exercise with the fewest recorded sessions.
+
+        The ordering runs in SQL with a LIMIT 1, so the stats table is
+        never materialized in Python just to take a minimum.
+
+        Returns:
+            ExerciseStats object or None if no stats exist
+        """
+        cursor = self._conn.execute("""
+            SELECT * FROM exercise_stats
+            ORDER BY total_sessions ASC
+            LIMIT 1
+        """)
+
+        row = cursor.fetchone()
+        if row:
+            return self._row_to_stats(row)
+
+        return None
+
+    def _row_to_stats(self, row: sqlite3.Row) -> ExerciseStats:
+        """Convert database row to ExerciseStats object."""
+        return ExerciseStats(
+            exercise_type=row['exercise_type'],
+            total_sessions=row['total_sessions'],
+            total_reps=row['total_reps'],
+            total_duration=row['total_duration'],
+            average_reps_per_session=row['average_reps_per_session'],
+            average_session_duration=row['average_session_duration'],
+            best_session_reps=row['best_session_reps'],
+            best_session_duration=row['best_session_duration'],
+            average_form_score=row['average_form_score'],
+            last_session_date=datetime.fromisoformat(row['last_session_date']) if row['last_session_date'] else None
+        )
+
+    def _row_to_session(self, row: sqlite3.Row) -> WorkoutSession:
         """Convert database row to WorkoutSession object."""
         return WorkoutSession(
-            id=row[0],
-            exercise_type=row[1],
-            start_time=datetime.fromisoformat(row[2]) if row[2] else None,
-            end_time=datetime.fromisoformat(row[3]) if row[3] else None,
-            total_reps=row[4],
-            duration_seconds=row[5],
-            average_form_score=row[6],
-            input_source=row[7],
-            notes=row[8],
-            rep_times=json.loads(row[9]) if row[9] else [],
-            form_feedback_history=json.loads(row[10]) if row[10] else []
+            id=row['id'],
+            exercise_type=row['exercise_type'],
+            start_time=datetime.fromisoformat(row['start_time']) if row['start_time'] else None,
+            end_time=datetime.fromisoformat(row['end_time']) if row['end_time'] else None,
+            total_reps=row['total_reps'],
+            duration_seconds=row['duration_seconds'],
+            average_form_score=row['average_form_score'],
+            input_source=row['input_source'],
+            notes=row['notes'],
+            rep_times=_json_loads(row['rep_times']) if row['rep_times'] else [],
+            form_feedback_history=_json_loads(row['form_feedback_history']) if row['form_feedback_history'] else []
         )
     
     def _update_exercise_stats(self, session: WorkoutSession):
         """Update exercise statistics after saving a session."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get current stats
-            cursor.execute("""
-                SELECT total_sessions, total_reps, total_duration,
-                       best_session_reps, best_session_duration, average_form_score
-                FROM exercise_stats WHERE exercise_type = ?
-            """, (session.exercise_type,))
-            
-            current_stats = cursor.fetchone()
-            
-            if current_stats:
-                # Update existing stats
-                total_sessions = current_stats[0] + 1
-                total_reps = current_stats[1] + session.total_reps
-                total_duration = current_stats[2] + session.duration_seconds
-                best_reps = max(current_stats[3], session.total_reps)
-                best_duration = max(current_stats[4], session.duration_seconds)
-                
-                # Calculate new averages
-                avg_reps = total_reps / total_sessions
-                avg_duration = total_duration / total_sessions
-                
-                # Update average form score
-                old_avg_form = current_stats[5]
-                new_avg_form = ((old_avg_form * (total_sessions - 1)) + session.average_form_score) / total_sessions
-                
-                cursor.execute("""
-                    UPDATE exercise_stats SET
-                        total_sessions = ?,
-                        total_reps = ?,
-                        total_duration = ?,
-                        average_reps_per_session = ?,
-                        average_session_duration = ?,
-                        best_session_reps = ?,
-                        best_session_duration = ?,
-                        average_form_score = ?,
-                        last_session_date = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE exercise_type = ?
-                """, (
-                    total_sessions, total_reps, total_duration,
-                    avg_reps, avg_duration, best_reps, best_duration,
-                    new_avg_form, session.start_time.isoformat(),
-                    session.exercise_type
-                ))
-            else:
-                # Create new stats entry
-                cursor.execute("""
-                    INSERT INTO exercise_stats (
-                        exercise_type, total_sessions, total_reps, total_duration,
-                        average_reps_per_session, average_session_duration,
-                        best_session_reps, best_session_duration, average_form_score,
-                        last_session_date
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session.exercise_type, 1, session.total_reps, session.duration_seconds,
-                    session.total_reps, session.duration_seconds,
-                    session.total_reps, session.duration_seconds, session.average_form_score,
-                    session.start_time.isoformat()
-                ))
+        # Single upsert instead of a SELECT followed by UPDATE/INSERT: the
+        # RHS expressions in DO UPDATE see the pre-update row, so the
+        # running totals and averages fold in the new session in one
+        # round-trip without a read-modify-write race
+        self._conn.execute("""
+            INSERT INTO exercise_stats (
+                exercise_type, total_sessions, total_reps, total_duration,
+                average_reps_per_session, average_session_duration,
+                best_session_reps, best_session_duration, average_form_score,
+                last_session_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(exercise_type) DO UPDATE SET
+                total_sessions = total_sessions + 1,
+                total_reps = total_reps + excluded.total_reps,
+                total_duration = total_duration + excluded.total_duration,
+                average_reps_per_session =
+                    (total_reps + excluded.total_reps) * 1.0
+                    / (total_sessions + 1),
+                average_session_duration =
+                    (total_duration + excluded.total_duration)
+                    / (total_sessions + 1),
+                best_session_reps =
+                    max(best_session_reps, excluded.best_session_reps),
+                best_session_duration =
+                    max(best_session_duration, excluded.best_session_duration),
+                average_form_score =
+                    (average_form_score * total_sessions
+                     + excluded.average_form_score)
+                    / (total_sessions + 1),
+                last_session_date = excluded.last_session_date,
+                updated_at = CURRENT_TIMESTAMP
+        """, (
+            session.exercise_type, 1, session.total_reps, session.duration_seconds,
+            session.total_reps, session.duration_seconds,
+            session.total_reps, session.duration_seconds, session.average_form_score,
+            session.start_time.isoformat()
+        ))
     
     def delete_session(self, session_id: int) -> bool:
         """
@@ -355,7 +512,12 @@ class WorkoutDatabase:
         Returns:
             True if session was deleted
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM workout_sessions WHERE id = ?", (session_id,))
-            return cursor.rowcount > 0
\ No newline at end of file
+        with self._write_lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM workout_sessions WHERE id = ?", (session_id,)
+            )
+            return cursor.rowcount > 0
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
\ No newline at end of file
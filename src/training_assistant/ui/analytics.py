@@ -10,6 +10,186 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 from ..data.models import WorkoutDatabase, WorkoutSession, ExerciseStats
+from ..exercises.exercise_library import ALL_EXERCISE_NAMES
+
+
+def _sessions_cache_key(sessions: List[WorkoutSession]) -> tuple:
+    """Small hashable fingerprint of a session list for st.cache_data.
+
+    Sessions arrive newest-first, so (count, newest id) changes whenever
+    the underlying data does; hashing this beats hashing the objects.
+    """
+    return (len(sessions), sessions[0].id if sessions else 0)
+
+
+@st.cache_data(ttl=60)
+def _load_recent_sessions(_database: WorkoutDatabase,
+                          start_iso: str = None,
+                          limit: int = 100) -> List[WorkoutSession]:
+    """Fetch recent sessions once per minute instead of per rerun.
+
+    When a window start is given the filter runs in SQL, so rows
+    outside the range never cross the database boundary.
+    """
+    if start_iso is not None:
+        return _database.get_sessions_since(datetime.fromisoformat(start_iso),
+                                            limit=limit)
+    return _database.get_recent_sessions(limit=limit)
+
+
+@st.cache_data
+def _sessions_to_columns(session_key: tuple,
+                         _sessions: List[WorkoutSession]) -> pd.DataFrame:
+    """Columnar view of a session list, built in one pass.
+
+    Every chart pulls a single field per session; reading those through
+    the Python objects drags each whole object through cache for one
+    attribute. One typed DataFrame lets all downstream transforms run on
+    pandas' vectorized paths instead.
+    """
+    df = pd.DataFrame({
+        'start_time': pd.to_datetime([s.start_time for s in _sessions]),
+        'total_reps': pd.array([s.total_reps for s in _sessions],
+                               dtype='int32'),
+        'duration_seconds': pd.array(
+            [s.duration_seconds or 0 for s in _sessions], dtype='float32'),
+        'exercise_type': pd.Categorical([s.exercise_type for s in _sessions]),
+    })
+    # Day-resolution timestamps computed once, vectorized; consumers can
+    # count and group on this without per-row .date() calls
+    df['date'] = df['start_time'].dt.normalize()
+    return df
+
+
+def _title_categories(column: pd.Series) -> pd.Series:
+    """Title-case a categorical column without leaving categorical dtype.
+
+    Renaming the handful of category labels is O(#categories); casting
+    to str and title-casing would allocate one Python string per row
+    and drop back to object dtype.
+    """
+    return column.cat.rename_categories(
+        {c: c.title() for c in column.cat.categories}
+    )
+
+
+@st.cache_data
+def _frequency_series(session_key: tuple, _columns: pd.DataFrame) -> pd.Series:
+    """Daily session counts over the covered date range, zero-filled."""
+    dates = _columns['date'].dropna()
+    if dates.empty:
+        return pd.Series(dtype='int64')
+
+    # Stay on pandas' C paths: count the precomputed day column, then one
+    # reindex fills the missing days instead of a Python assignment loop
+    date_counts = dates.value_counts().sort_index()
+    date_range = pd.date_range(start=date_counts.index.min(),
+                               end=date_counts.index.max())
+    return date_counts.reindex(date_range, fill_value=0)
+
+
+@st.cache_data
+def _progress_frame(session_key: tuple, _columns: pd.DataFrame) -> pd.DataFrame:
+    """Per-session date/exercise/reps/duration rows for the progress chart."""
+    valid = _columns[_columns['start_time'].notna()]
+    return pd.DataFrame({
+        'date': valid['date'],
+        'exercise': _title_categories(valid['exercise_type']),
+        'reps': valid['total_reps'],
+        'duration': valid['duration_seconds'],
+    })
+
+
+@st.cache_data
+def _duration_frame(session_key: tuple, _columns: pd.DataFrame) -> pd.DataFrame:
+    """Exercise/duration-in-minutes rows for the box plot."""
+    valid = _columns[_columns['duration_seconds'] > 0]
+    return pd.DataFrame({
+        'exercise': _title_categories(valid['exercise_type']),
+        'duration_minutes': valid['duration_seconds'] / 60,
+    })
+
+
+@st.cache_data(ttl=30)
+def _recent_sessions_for(exercise: str, last_session_iso,
+                         _database: WorkoutDatabase) -> List[WorkoutSession]:
+    """Fetch the detail sessions for one exercise, cached per selection.
+
+    The stat's last_session_date rides in the key, so the cache rolls
+    over as soon as a new session lands for that exercise.
+    """
+    return _database.get_sessions_by_exercise(exercise, limit=10)
+
+
+@st.cache_resource(max_entries=32)
+def _build_frequency_fig(session_key: tuple, _full_data: pd.Series):
+    """Build (and memoize) the daily-frequency bar chart."""
+    fig = px.bar(
+        x=_full_data.index,
+        y=_full_data.values,
+        title="Daily Workout Sessions",
+        labels={'x': 'Date', 'y': 'Sessions'}
+    )
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Number of Sessions",
+        showlegend=False
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=32)
+def _build_progress_fig(session_key: tuple, exercise: str,
+                        _exercise_data: pd.DataFrame):
+    """Build (and memoize) the per-exercise progress line chart."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=_exercise_data['date'],
+        y=_exercise_data['reps'],
+        mode='lines+markers',
+        name='Reps',
+        line=dict(color='#1f77b4')
+    ))
+    fig.update_layout(
+        title=f"{exercise} Progress",
+        xaxis_title="Date",
+        yaxis_title="Repetitions",
+        showlegend=False
+    )
+    return fig
+
+
+@st.cache_resource(max_entries=32)
+def _build_pie_fig(reps_by_exercise: tuple):
+    """Build (and memoize) the reps-distribution pie chart.
+
+    The (name, reps) pairs themselves are the cache key, so the data is
+    reconstructed from the key and nothing else needs hashing.
+    """
+    fig = px.pie(
+        values=[reps for _, reps in reps_by_exercise],
+        names=[name for name, _ in reps_by_exercise],
+        title="Total Reps Distribution"
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+@st.cache_resource(max_entries=32)
+def _build_box_fig(session_key: tuple, _df: pd.DataFrame):
+    """Build (and memoize) the session-duration box plot."""
+    fig = px.box(
+        _df,
+        x='exercise',
+        y='duration_minutes',
+        title="Session Duration by Exercise"
+    )
+    fig.update_layout(
+        xaxis_title="Exercise",
+        yaxis_title="Duration (minutes)",
+        xaxis_tickangle=-45
+    )
+    return fig
 
 
 def create_analytics_view():
@@ -28,9 +208,12 @@ def create_analytics_view():
     
     with col2:
         refresh_data = st.button("Refresh Data", key="refresh_analytics")
-    
-    # Get data based on time range
-    end_date = datetime.now()
+    if refresh_data:
+        _load_recent_sessions.clear()
+
+    # Get data based on time range; the window start is truncated to the
+    # hour so the cache key stays stable across reruns within that hour
+    end_date = datetime.now().replace(minute=0, second=0, microsecond=0)
     if time_range == "Last 7 days":
         start_date = end_date - timedelta(days=7)
     elif time_range == "Last 30 days":
@@ -39,37 +222,47 @@ def create_analytics_view():
         start_date = end_date - timedelta(days=90)
     else:
         start_date = None  # All time
-    
-    # Get recent sessions and stats
-    recent_sessions = database.get_recent_sessions(limit=100)
+
+    # Get recent sessions and stats; the time filter runs in SQL
+    recent_sessions = _load_recent_sessions(
+        database, start_date.isoformat() if start_date else None
+    )
     exercise_stats = database.get_all_exercise_stats()
-    
-    if not recent_sessions:
+
+    if not recent_sessions and start_date is None:
         st.info("No workout data available yet. Complete some workouts to see analytics!")
         return
-    
-    # Filter sessions by time range
-    if start_date:
-        recent_sessions = [
-            session for session in recent_sessions
-            if session.start_time and session.start_time >= start_date
-        ]
-    
+
+    # One columnar conversion feeds the metrics and every chart.
+    # Unrelated widget interactions (e.g. the breakdown selectbox) rerun
+    # this whole function, so track a signature of the inputs in session
+    # state and reuse the previous frame when nothing upstream changed;
+    # the figure builders below are cached the same way, leaving such
+    # reruns as pure re-display of already-built objects
+    session_key = _sessions_cache_key(recent_sessions)
+    analytics_signature = (time_range, session_key)
+    if st.session_state.get('_analytics_signature') == analytics_signature:
+        columns = st.session_state['_analytics_columns']
+    else:
+        columns = _sessions_to_columns(session_key, recent_sessions)
+        st.session_state['_analytics_signature'] = analytics_signature
+        st.session_state['_analytics_columns'] = columns
+
     # Overview metrics
-    create_overview_metrics(recent_sessions, exercise_stats)
-    
+    create_overview_metrics(columns, exercise_stats)
+
     st.markdown("---")
-    
+
     # Charts and visualizations
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        create_workout_frequency_chart(recent_sessions)
+        create_workout_frequency_chart(session_key, columns)
         create_reps_by_exercise_chart(exercise_stats)
-    
+
     with col2:
-        create_progress_over_time_chart(recent_sessions)
-        create_session_duration_chart(recent_sessions)
+        create_progress_over_time_chart(session_key, columns)
+        create_session_duration_chart(session_key, columns)
     
     st.markdown("---")
     
@@ -77,18 +270,15 @@ def create_analytics_view():
     create_exercise_breakdown(exercise_stats, database)
 
 
-def create_overview_metrics(sessions: List[WorkoutSession], stats: List[ExerciseStats]):
-    """Create overview metrics cards."""
+def create_overview_metrics(columns: pd.DataFrame, stats: List[ExerciseStats]):
+    """Create overview metrics cards from the shared columnar frame."""
     st.subheader("📈 Overview")
-    
-    # Calculate metrics
-    total_sessions = len(sessions)
-    total_reps = sum(session.total_reps for session in sessions)
-    total_duration = sum(session.duration_seconds for session in sessions if session.duration_seconds)
+
+    total_sessions = len(columns)
+    total_reps = int(columns['total_reps'].sum())
+    total_duration = float(columns['duration_seconds'].sum())
     avg_session_duration = total_duration / total_sessions if total_sessions > 0 else 0
-    
-    # Unique exercises
-    unique_exercises = len(set(session.exercise_type for session in sessions))
+    unique_exercises = columns['exercise_type'].nunique()
     
     # Display metrics
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -106,16 +296,17 @@ def create_overview_metrics(sessions: List[WorkoutSession], stats: List[Exercise
         )
     
     with col3:
-        hours = int(total_duration // 3600)
-        minutes = int((total_duration % 3600) // 60)
+        # Integer divmod: one division pair instead of repeated float
+        # floordiv/modulo chains
+        hours, rem = divmod(int(total_duration), 3600)
+        minutes = rem // 60
         st.metric(
             label="Total Time",
             value=f"{hours}h {minutes}m"
         )
     
     with col4:
-        avg_minutes = int(avg_session_duration // 60)
-        avg_seconds = int(avg_session_duration % 60)
+        avg_minutes, avg_seconds = divmod(int(avg_session_duration), 60)
         st.metric(
             label="Avg Session",
             value=f"{avg_minutes}:{avg_seconds:02d}"
@@ -128,71 +319,37 @@ def create_overview_metrics(sessions: List[WorkoutSession], stats: List[Exercise
         )
 
 
-def create_workout_frequency_chart(sessions: List[WorkoutSession]):
+def create_workout_frequency_chart(session_key: tuple, columns: pd.DataFrame):
     """Create workout frequency chart."""
     st.subheader("🗓️ Workout Frequency")
-    
-    if not sessions:
+
+    if columns.empty:
         st.info("No session data available")
         return
-    
-    # Group sessions by date
-    session_dates = [session.start_time.date() for session in sessions if session.start_time]
-    date_counts = pd.Series(session_dates).value_counts().sort_index()
-    
-    # Create date range for the chart
-    if len(date_counts) > 0:
-        start_date = min(date_counts.index)
-        end_date = max(date_counts.index)
-        date_range = pd.date_range(start=start_date, end=end_date)
-        
-        # Fill missing dates with 0
-        full_data = pd.Series(index=date_range, data=0)
-        for date, count in date_counts.items():
-            full_data[date] = count
-        
-        # Create chart
-        fig = px.bar(
-            x=full_data.index,
-            y=full_data.values,
-            title="Daily Workout Sessions",
-            labels={'x': 'Date', 'y': 'Sessions'}
-        )
-        
-        fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Number of Sessions",
-            showlegend=False
-        )
-        
+
+    # Daily counts come from the cached transform; recomputed only when
+    # the session list actually changes, not on every widget interaction
+    full_data = _frequency_series(session_key, columns)
+
+    if len(full_data) > 0:
+        fig = _build_frequency_fig(session_key, full_data)
         st.plotly_chart(fig, use_container_width=True)
 
 
-def create_progress_over_time_chart(sessions: List[WorkoutSession]):
+def create_progress_over_time_chart(session_key: tuple, columns: pd.DataFrame):
     """Create progress over time chart."""
     st.subheader("📈 Progress Over Time")
-    
-    if not sessions:
+
+    if columns.empty:
         st.info("No session data available")
         return
-    
-    # Group by exercise type and date
-    df_data = []
-    for session in sessions:
-        if session.start_time:
-            df_data.append({
-                'date': session.start_time.date(),
-                'exercise': session.exercise_type.title(),
-                'reps': session.total_reps,
-                'duration': session.duration_seconds
-            })
-    
-    if not df_data:
+
+    df = _progress_frame(session_key, columns)
+
+    if df.empty:
         st.info("No valid session data available")
         return
     
-    df = pd.DataFrame(df_data)
-    
     # Exercise selector
     selected_exercise = st.selectbox(
         "Select Exercise for Progress",
@@ -206,25 +363,8 @@ def create_progress_over_time_chart(sessions: List[WorkoutSession]):
     if len(exercise_data) == 0:
         st.info(f"No data available for {selected_exercise}")
         return
-    
-    # Create line chart
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=exercise_data['date'],
-        y=exercise_data['reps'],
-        mode='lines+markers',
-        name='Reps',
-        line=dict(color='#1f77b4')
-    ))
-    
-    fig.update_layout(
-        title=f"{selected_exercise} Progress",
-        xaxis_title="Date",
-        yaxis_title="Repetitions",
-        showlegend=False
-    )
-    
+
+    fig = _build_progress_fig(session_key, selected_exercise, exercise_data)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -236,56 +376,27 @@ def create_reps_by_exercise_chart(stats: List[ExerciseStats]):
         st.info("No exercise statistics available")
         return
     
-    # Prepare data
-    exercise_names = [stat.exercise_type.title() for stat in stats]
-    total_reps = [stat.total_reps for stat in stats]
-    
-    # Create pie chart
-    fig = px.pie(
-        values=total_reps,
-        names=exercise_names,
-        title="Total Reps Distribution"
+    fig = _build_pie_fig(
+        tuple((stat.display_name, stat.total_reps) for stat in stats)
     )
-    
-    fig.update_traces(textposition='inside', textinfo='percent+label')
     st.plotly_chart(fig, use_container_width=True)
 
 
-def create_session_duration_chart(sessions: List[WorkoutSession]):
+def create_session_duration_chart(session_key: tuple, columns: pd.DataFrame):
     """Create session duration chart."""
     st.subheader("⏱️ Session Durations")
-    
-    if not sessions:
+
+    if columns.empty:
         st.info("No session data available")
         return
-    
-    # Prepare data
-    durations = [session.duration_seconds / 60 for session in sessions if session.duration_seconds]  # Convert to minutes
-    exercise_types = [session.exercise_type.title() for session in sessions if session.duration_seconds]
-    
-    if not durations:
+
+    df = _duration_frame(session_key, columns)
+
+    if df.empty:
         st.info("No duration data available")
         return
-    
-    # Create box plot
-    df = pd.DataFrame({
-        'exercise': exercise_types,
-        'duration_minutes': durations
-    })
-    
-    fig = px.box(
-        df,
-        x='exercise',
-        y='duration_minutes',
-        title="Session Duration by Exercise"
-    )
-    
-    fig.update_layout(
-        xaxis_title="Exercise",
-        yaxis_title="Duration (minutes)",
-        xaxis_tickangle=-45
-    )
-    
+
+    fig = _build_box_fig(session_key, df)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -297,22 +408,19 @@ def create_exercise_breakdown(stats: List[ExerciseStats], database: WorkoutDatab
         st.info("No exercise statistics available")
         return
     
-    # Create a detailed table
-    breakdown_data = []
-    for stat in stats:
-        breakdown_data.append({
-            'Exercise': stat.exercise_type.title(),
-            'Total Sessions': stat.total_sessions,
-            'Total Reps': f"{stat.total_reps:,}",
-            'Avg Reps/Session': f"{stat.average_reps_per_session:.1f}",
-            'Total Duration': f"{stat.total_duration / 60:.1f} min",
-            'Avg Duration': f"{stat.average_session_duration / 60:.1f} min",
-            'Best Session': f"{stat.best_session_reps} reps",
-            'Avg Form Score': f"{stat.average_form_score:.1f}/10",
-            'Last Session': stat.last_session_date.strftime('%Y-%m-%d') if stat.last_session_date else 'Never'
-        })
-    
-    df = pd.DataFrame(breakdown_data)
+    # Build the table column-wise: one dict-of-lists construction instead
+    # of N per-row dicts fed through pandas' slow records inference
+    df = pd.DataFrame({
+        'Exercise': [s.display_name for s in stats],
+        'Total Sessions': [s.total_sessions for s in stats],
+        'Total Reps': [s.total_reps_str for s in stats],
+        'Avg Reps/Session': [f"{s.average_reps_per_session:.1f}" for s in stats],
+        'Total Duration': [s.total_duration_min_str for s in stats],
+        'Avg Duration': [s.avg_duration_min_str for s in stats],
+        'Best Session': [f"{s.best_session_reps} reps" for s in stats],
+        'Avg Form Score': [f"{s.average_form_score:.1f}/10" for s in stats],
+        'Last Session': [s.last_session_str for s in stats],
+    })
     st.dataframe(df, use_container_width=True)
     
     # Exercise-specific details
@@ -326,8 +434,19 @@ def create_exercise_breakdown(stats: List[ExerciseStats], database: WorkoutDatab
             key="exercise_detail_selector"
         )
         
-        # Get recent sessions for the selected exercise
-        recent_exercise_sessions = database.get_sessions_by_exercise(selected_exercise_detail, limit=10)
+        # Get recent sessions for the selected exercise; cached so a
+        # rerun from an unrelated widget skips the query
+        selected_stat = next(
+            (s for s in stats if s.exercise_type == selected_exercise_detail),
+            None
+        )
+        last_iso = (
+            selected_stat.last_session_date.isoformat()
+            if selected_stat and selected_stat.last_session_date else None
+        )
+        recent_exercise_sessions = _recent_sessions_for(
+            selected_exercise_detail, last_iso, database
+        )
         
         if recent_exercise_sessions:
             st.markdown(f"### Recent {selected_exercise_detail.title()} Sessions")
@@ -361,29 +480,34 @@ def create_dashboard():
     # Quick stats
     if recent_sessions:
         st.subheader("🎯 Quick Stats")
-        
+
+        # One clock read and one pass over the sessions for both counters
+        now = datetime.now()
+        today = now.date()
+        week_ago = now - timedelta(days=7)
+        total_sessions_today = 0
+        weekly_sessions = 0
+        for s in recent_sessions:
+            if s.start_time:
+                if s.start_time.date() == today:
+                    total_sessions_today += 1
+                if s.start_time >= week_ago:
+                    weekly_sessions += 1
+
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
-            total_sessions_today = len([
-                s for s in recent_sessions 
-                if s.start_time and s.start_time.date() == datetime.now().date()
-            ])
             st.metric("Today's Sessions", total_sessions_today)
-        
+
         with col2:
             last_session = recent_sessions[0] if recent_sessions else None
             if last_session and last_session.start_time:
-                days_since = (datetime.now() - last_session.start_time).days
+                days_since = (now - last_session.start_time).days
                 st.metric("Days Since Last Workout", days_since)
             else:
                 st.metric("Days Since Last Workout", "∞")
-        
+
         with col3:
-            weekly_sessions = len([
-                s for s in recent_sessions 
-                if s.start_time and s.start_time >= datetime.now() - timedelta(days=7)
-            ])
             st.metric("This Week's Sessions", weekly_sessions)
         
         # Recent sessions
@@ -394,15 +518,14 @@ def create_dashboard():
                 col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
                 
                 with col1:
-                    st.markdown(f"**{session.exercise_type.title()}**")
+                    st.markdown(f"**{session.display_name}**")
                 
                 with col2:
                     st.markdown(f"{session.total_reps} reps")
                 
                 with col3:
                     if session.duration_seconds:
-                        minutes = int(session.duration_seconds // 60)
-                        seconds = int(session.duration_seconds % 60)
+                        minutes, seconds = divmod(int(session.duration_seconds), 60)
                         st.markdown(f"{minutes}:{seconds:02d}")
                     else:
                         st.markdown("--:--")
@@ -422,19 +545,19 @@ def create_dashboard():
     if exercise_stats:
         st.subheader("💡 Recommendations")
         
-        # Find least practiced exercise
-        least_practiced = min(exercise_stats, key=lambda x: x.total_sessions)
+        # Find least practiced exercise; the ORDER BY ... LIMIT 1 runs in
+        # SQL instead of scanning the stats list in Python
+        least_practiced = database.get_least_practiced_exercise()
         
-        # Find exercise not done recently
+        # Find exercise not done recently; the full name set is a static
+        # module constant, so only the recent set is built per rerun
         recent_exercises = {s.exercise_type for s in recent_sessions[:5]}
-        exercise_library = st.session_state.exercise_library
-        all_exercises = set(exercise_library.get_all_exercises().keys())
-        not_recent = all_exercises - recent_exercises
+        not_recent = ALL_EXERCISE_NAMES - recent_exercises
         
         if not_recent:
             recommended = list(not_recent)[0]
             st.info(f"💪 Try **{recommended.title()}** - you haven't done this recently!")
         elif least_practiced:
-            st.info(f"🎯 Consider practicing **{least_practiced.exercise_type.title()}** - only {least_practiced.total_sessions} sessions so far!")
+            st.info(f"🎯 Consider practicing **{least_practiced.display_name}** - only {least_practiced.total_sessions} sessions so far!")
         else:
             st.success("🌟 Great job! You're practicing all exercises regularly!")
\ No newline at end of file
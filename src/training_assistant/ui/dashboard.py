@@ -2,20 +2,61 @@
 Dashboard UI components.
 """
 
+import string
+
 import streamlit as st
+import pandas as pd
 from datetime import datetime, timedelta
 from ..data.models import WorkoutDatabase
 
 
+# Compiled once at import; each render only substitutes the per-session
+# values instead of rebuilding the whole HTML block
+_CARD_TPL = string.Template("""
+        <div style="
+            border: 1px solid #ddd;
+            border-radius: 8px;
+            padding: 16px;
+            margin: 8px 0;
+            background-color: #f9f9f9;
+        ">
+            <h4>$name</h4>
+            <p><strong>Reps:</strong> $reps</p>
+            <p><strong>Duration:</strong> $duration minutes</p>
+            <p><strong>Date:</strong> $date</p>
+        </div>
+        """)
+
+
+def _format_mm_ss(seconds) -> str:
+    """Format a duration as M:SS, or --:-- when unknown."""
+    if not seconds:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes}:{secs:02d}"
+
+
+@st.cache_data(ttl=30)
+def _load_dashboard_data(_database, db_path: str):
+    """Fetch the dashboard's session and stats data.
+
+    Cached for a short TTL keyed on the database path (the database
+    object itself is unhashable, hence the underscore) so widget
+    interactions within the window skip both queries; saving a workout
+    clears the cache explicitly.
+    """
+    return (_database.get_recent_sessions(limit=10),
+            _database.get_all_exercise_stats())
+
+
 def create_dashboard():
     """Create the main dashboard."""
     st.title("📊 Training Dashboard")
-    
+
     database = st.session_state.database
-    
+
     # Get recent data
-    recent_sessions = database.get_recent_sessions(limit=10)
-    exercise_stats = database.get_all_exercise_stats()
+    recent_sessions, exercise_stats = _load_dashboard_data(database, database.db_path)
     
     if not recent_sessions:
         st.info("No workout data available yet. Complete some workouts to see your dashboard!")
@@ -31,14 +72,20 @@ def create_dashboard():
         """)
         
         return
-    
+
+    # Read the clock once and derive the day/week boundaries here so the
+    # sections below share them instead of each calling datetime.now()
+    now = datetime.now()
+    today_start = datetime.combine(now.date(), datetime.min.time())
+    week_ago = now - timedelta(days=7)
+
     # Quick overview metrics
-    create_quick_metrics(recent_sessions, exercise_stats)
-    
+    create_quick_metrics(recent_sessions, exercise_stats, now, today_start, week_ago)
+
     st.markdown("---")
-    
+
     # Today's activity
-    create_todays_activity(recent_sessions)
+    create_todays_activity(recent_sessions, today_start)
     
     st.markdown("---")
     
@@ -48,31 +95,35 @@ def create_dashboard():
     st.markdown("---")
     
     # Progress insights
-    create_progress_insights(exercise_stats)
+    create_progress_insights(exercise_stats, now)
 
 
-def create_quick_metrics(recent_sessions, exercise_stats):
+def create_quick_metrics(recent_sessions, exercise_stats, now, today_start, week_ago):
     """Create quick overview metrics."""
     st.subheader("📈 Quick Overview")
-    
-    # Calculate metrics
-    today = datetime.now().date()
-    week_ago = datetime.now() - timedelta(days=7)
-    
-    todays_sessions = [s for s in recent_sessions if s.start_time and s.start_time.date() == today]
-    weeks_sessions = [s for s in recent_sessions if s.start_time and s.start_time >= week_ago]
-    
-    total_reps_today = sum(s.total_reps for s in todays_sessions)
-    total_reps_week = sum(s.total_reps for s in weeks_sessions)
-    
+
+    # One pass fills both buckets; comparing against the start-of-day
+    # datetime avoids a .date() allocation per session
+    todays_count = weeks_count = 0
+    total_reps_today = total_reps_week = 0
+    for s in recent_sessions:
+        if not s.start_time:
+            continue
+        if s.start_time >= week_ago:
+            weeks_count += 1
+            total_reps_week += s.total_reps
+        if s.start_time >= today_start:
+            todays_count += 1
+            total_reps_today += s.total_reps
+
     # Display metrics in columns
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
             label="Today's Sessions",
-            value=len(todays_sessions),
-            delta=f"+{len(todays_sessions)}" if len(todays_sessions) > 0 else None
+            value=todays_count,
+            delta=f"+{todays_count}" if todays_count > 0 else None
         )
     
     with col2:
@@ -85,7 +136,7 @@ def create_quick_metrics(recent_sessions, exercise_stats):
     with col3:
         st.metric(
             label="This Week",
-            value=f"{len(weeks_sessions)} sessions",
+            value=f"{weeks_count} sessions",
             delta=f"{total_reps_week} reps"
         )
     
@@ -93,7 +144,7 @@ def create_quick_metrics(recent_sessions, exercise_stats):
         if recent_sessions:
             last_session = recent_sessions[0]
             if last_session.start_time:
-                days_ago = (datetime.now() - last_session.start_time).days
+                days_ago = (now - last_session.start_time).days
                 if days_ago == 0:
                     last_workout = "Today"
                 elif days_ago == 1:
@@ -111,12 +162,11 @@ def create_quick_metrics(recent_sessions, exercise_stats):
         )
 
 
-def create_todays_activity(recent_sessions):
+def create_todays_activity(recent_sessions, today_start):
     """Create today's activity section."""
     st.subheader("📅 Today's Activity")
-    
-    today = datetime.now().date()
-    todays_sessions = [s for s in recent_sessions if s.start_time and s.start_time.date() == today]
+
+    todays_sessions = [s for s in recent_sessions if s.start_time and s.start_time >= today_start]
     
     if not todays_sessions:
         st.info("No workouts completed today yet. Start your first session!")
@@ -137,69 +187,50 @@ def create_todays_activity(recent_sessions):
         
         return
     
-    # Show today's sessions
+    # Show today's sessions as a single table: one render call pushes
+    # one Arrow payload to the browser instead of four widgets per row
     st.markdown(f"**{len(todays_sessions)} session(s) completed today:**")
-    
-    for i, session in enumerate(todays_sessions, 1):
-        with st.container():
-            col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
-            
-            with col1:
-                st.markdown(f"**{i}. {session.exercise_type.title()}**")
-            
-            with col2:
-                st.markdown(f"🔄 {session.total_reps} reps")
-            
-            with col3:
-                if session.duration_seconds:
-                    minutes = int(session.duration_seconds // 60)
-                    seconds = int(session.duration_seconds % 60)
-                    st.markdown(f"⏱️ {minutes}:{seconds:02d}")
-                else:
-                    st.markdown("⏱️ --:--")
-            
-            with col4:
-                if session.start_time:
-                    time_str = session.start_time.strftime('%H:%M')
-                    st.markdown(f"🕐 {time_str}")
-                else:
-                    st.markdown("🕐 --:--")
+
+    df = pd.DataFrame({
+        '#': list(range(1, len(todays_sessions) + 1)),
+        'Exercise': [s.display_name for s in todays_sessions],
+        'Reps': [s.total_reps for s in todays_sessions],
+        'Duration': [_format_mm_ss(s.duration_seconds) for s in todays_sessions],
+        'Time': [
+            s.start_time.strftime('%H:%M') if s.start_time else '--:--'
+            for s in todays_sessions
+        ],
+    })
+    st.dataframe(df, hide_index=True, use_container_width=True)
 
 
 def create_recent_sessions_summary(recent_sessions):
     """Create recent sessions summary."""
     st.subheader("🕐 Recent Sessions")
-    
-    # Show last 5 sessions
-    for session in recent_sessions[:5]:
-        with st.expander(
-            f"{session.exercise_type.title()} - {session.total_reps} reps "
-            f"({session.start_time.strftime('%m/%d %H:%M') if session.start_time else 'Unknown time'})"
-        ):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown(f"**Exercise:** {session.exercise_type.title()}")
-                st.markdown(f"**Repetitions:** {session.total_reps}")
-                if session.duration_seconds:
-                    minutes = int(session.duration_seconds // 60)
-                    seconds = int(session.duration_seconds % 60)
-                    st.markdown(f"**Duration:** {minutes}:{seconds:02d}")
-                st.markdown(f"**Input Source:** {session.input_source.title()}")
-            
-            with col2:
-                if session.start_time:
-                    st.markdown(f"**Date:** {session.start_time.strftime('%Y-%m-%d')}")
-                    st.markdown(f"**Time:** {session.start_time.strftime('%H:%M:%S')}")
-                
-                if session.average_form_score > 0:
-                    st.markdown(f"**Form Score:** {session.average_form_score:.1f}/10")
-                
-                if session.notes:
-                    st.markdown(f"**Notes:** {session.notes}")
-
-
-def create_progress_insights(exercise_stats):
+
+    # One table render for the last 5 sessions: a per-session expander
+    # with two columns and half a dozen markdown widgets cost ~70 widget
+    # instantiations, while a single dataframe ships one Arrow payload
+    last = recent_sessions[:5]
+    df = pd.DataFrame({
+        'Exercise': [s.display_name for s in last],
+        'Reps': [s.total_reps for s in last],
+        'Duration': [_format_mm_ss(s.duration_seconds) for s in last],
+        'Source': [s.input_source.title() for s in last],
+        'When': [
+            s.start_time.strftime('%Y-%m-%d %H:%M') if s.start_time else 'Unknown'
+            for s in last
+        ],
+        'Form Score': [
+            f"{s.average_form_score:.1f}/10" if s.average_form_score > 0 else ''
+            for s in last
+        ],
+        'Notes': [s.notes for s in last],
+    })
+    st.dataframe(df, hide_index=True, use_container_width=True)
+
+
+def create_progress_insights(exercise_stats, now):
     """Create progress insights and recommendations."""
     st.subheader("💡 Progress Insights")
     
@@ -207,32 +238,43 @@ def create_progress_insights(exercise_stats):
         st.info("Complete more workouts to see personalized insights!")
         return
     
-    # Find best performing exercise
-    best_exercise = max(exercise_stats, key=lambda x: x.total_reps)
-    
-    # Find most frequent exercise
-    most_frequent = max(exercise_stats, key=lambda x: x.total_sessions)
-    
-    # Find least practiced exercise
-    least_practiced = min(exercise_stats, key=lambda x: x.total_sessions)
-    
+    # One pass over the stats replaces the separate max/min/sum scans
+    # (and their per-element key lambdas) the insights used to make
+    best_exercise = most_frequent = least_practiced = exercise_stats[0]
+    total_sessions = 0
+    form_sum = 0.0
+    form_count = 0
+    current_week_sessions = 0
+    for stat in exercise_stats:
+        if stat.total_reps > best_exercise.total_reps:
+            best_exercise = stat
+        if stat.total_sessions > most_frequent.total_sessions:
+            most_frequent = stat
+        if stat.total_sessions < least_practiced.total_sessions:
+            least_practiced = stat
+        total_sessions += stat.total_sessions
+        if stat.average_form_score > 0:
+            form_sum += stat.average_form_score
+            form_count += 1
+        if stat.last_session_date and (now - stat.last_session_date).days <= 7:
+            current_week_sessions += 1
+
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 🏆 Your Strengths")
         
         st.success(
-            f"**Most Total Reps:** {best_exercise.exercise_type.title()} "
+            f"**Most Total Reps:** {best_exercise.display_name} "
             f"({best_exercise.total_reps:,} reps)"
         )
         
         st.success(
-            f"**Most Practiced:** {most_frequent.exercise_type.title()} "
+            f"**Most Practiced:** {most_frequent.display_name} "
             f"({most_frequent.total_sessions} sessions)"
         )
         
         # Calculate consistency
-        total_sessions = sum(stat.total_sessions for stat in exercise_stats)
         if total_sessions >= 5:
             st.success("**Consistency:** Great job maintaining a regular workout routine!")
         elif total_sessions >= 2:
@@ -246,7 +288,7 @@ def create_progress_insights(exercise_stats):
         # Recommend least practiced exercise
         if least_practiced.total_sessions < most_frequent.total_sessions / 2:
             st.info(
-                f"**Try More:** {least_practiced.exercise_type.title()} "
+                f"**Try More:** {least_practiced.display_name} "
                 f"(only {least_practiced.total_sessions} sessions)"
             )
         
@@ -254,18 +296,14 @@ def create_progress_insights(exercise_stats):
         st.info("**Challenge Yourself:** Try to beat your personal best!")
         
         # Form improvement suggestion
-        avg_form_scores = [stat.average_form_score for stat in exercise_stats if stat.average_form_score > 0]
-        if avg_form_scores:
-            avg_form = sum(avg_form_scores) / len(avg_form_scores)
+        if form_count:
+            avg_form = form_sum / form_count
             if avg_form < 7:
                 st.warning("**Focus on Form:** Consider slowing down to improve technique.")
             else:
                 st.success("**Great Form:** Your technique is excellent!")
         
         # Weekly goal suggestion
-        current_week_sessions = sum(1 for stat in exercise_stats if stat.last_session_date and 
-                                  (datetime.now() - stat.last_session_date).days <= 7)
-        
         if current_week_sessions < 3:
             st.info("**Weekly Goal:** Aim for 3+ workout sessions this week!")
         else:
@@ -275,17 +313,10 @@ def create_progress_insights(exercise_stats):
 def create_workout_summary_card(session):
     """Create a summary card for a workout session."""
     with st.container():
-        st.markdown(f"""
-        <div style="
-            border: 1px solid #ddd;
-            border-radius: 8px;
-            padding: 16px;
-            margin: 8px 0;
-            background-color: #f9f9f9;
-        ">
-            <h4>{session.exercise_type.title()}</h4>
-            <p><strong>Reps:</strong> {session.total_reps}</p>
-            <p><strong>Duration:</strong> {session.duration_seconds / 60:.1f} minutes</p>
-            <p><strong>Date:</strong> {session.start_time.strftime('%Y-%m-%d %H:%M') if session.start_time else 'Unknown'}</p>
-        </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown(_CARD_TPL.substitute(
+            name=session.display_name,
+            reps=session.total_reps,
+            duration=f"{session.duration_seconds / 60:.1f}",
+            date=(session.start_time.strftime('%Y-%m-%d %H:%M')
+                  if session.start_time else 'Unknown'),
+        ), unsafe_allow_html=True)
\ No newline at end of file